@@ -0,0 +1,151 @@
+import streamlit as st
+import pandas as pd
+import threading
+import time
+from datetime import date
+from storage import (TABS, WriteBatch, get_backend, get_setting, load_many, load_data, frame_from_values,
+                     concat_frames, clear_cache, invalidate)
+from metrics import METRICS
+
+# --- SICAK / SOĞUK BÖLÜMLER (ARŞİV) ---
+# Biten partiler ve kapanmış yılların kayıtları ana sekmeden "<sekme>_<yıl>" arşiv sekmelerine taşınır.
+# arsiv_manifest hangi bölümde hangi tarih aralığının olduğunu tutar. Sayfalar varsayılan olarak sadece
+# sıcak bölümü okur; geçmiş görünümleri bir başlangıç tarihi seçilince kesişen arşiv bölümlerini de okur.
+LOT_GRACE_DAYS = 90       # biten parti/ürün bu kadar gün sıcak kalır (yakın geçmiş izlenebilirliği)
+ARCHIVE_EVERY_HOURS = 24  # otomatik arşivleme sıklığı (süreç başına)
+
+# anahtar -> (benzersiz sütun, tarih sütunu, bakiye sütunu: 0'a inince parti "bitti")
+PARTITIONS = {
+    "inventory": ("Stok_ID", "Tarih", "Kalan_Miktar"),
+    "finished_goods": ("Uretim_ID", "Uretim_Tarihi", "Kalan_Net_KG"),
+    "production": ("Uretim_ID", "Tarih", None),
+    "shipments": ("Sevkiyat_ID", "Tarih", None),
+    "deletion_logs": ("Log_ID", "Tarih", None),
+    "consumption": ("Uretim_ID", None, None)  # tarihsiz: üretim kaydıyla aynı bölüme gider
+}
+
+def cold_rows(frames, today=None):
+    """Arşive gidecek satırların bölüm yılı -> {anahtar: Series(yıl, index=satır)}"""
+    today = pd.Timestamp(today or date.today()).normalize()
+    year0, grace = pd.Timestamp(today.year, 1, 1), today - pd.Timedelta(days=LOT_GRACE_DAYS)
+    out = {}
+    for key, (_, dcol, bcol) in PARTITIONS.items():
+        if dcol is None: continue
+        df = frames[key]
+        # Bakiyeli sekmeler: bitmiş ve eski; kayıt sekmeleri: kapanmış yıl. Tarihi boş olan sıcak kalır
+        mask = ((df[bcol] <= 0) & (df[dcol] < grace)) if bcol else (df[dcol] < year0)
+        out[key] = df.loc[mask, dcol].dt.year.astype(int)
+    # Depoda ürünü duran üretimin kaydı sıcak kalır; tüketim satırları üretimiyle birlikte taşınır
+    fg, prod, cons = frames["finished_goods"], frames["production"], frames["consumption"]
+    open_uids = set(fg["Uretim_ID"]) - set(fg.loc[out["finished_goods"].index, "Uretim_ID"])
+    p = out["production"]
+    out["production"] = p = p[~prod.loc[p.index, "Uretim_ID"].isin(open_uids).to_numpy()]
+    year_of = dict(zip(prod.loc[p.index, "Uretim_ID"], p))
+    out["consumption"] = cons["Uretim_ID"].map(year_of).dropna().astype(int)
+    return out
+
+_lock = threading.Lock()
+
+def archive_cold(today=None):
+    """Soğuk satırları arşiv bölümlerine taşı -> {sekme: taşınan satır}. Yarıda kalırsa tekrar çalıştırmak güvenli:
+    önce arşive yazılır (zaten orada olan eklenmez), sonra sıcak sekmeden silinir.
+    Okuma-kopyalama-silme motorun yazma kilidi altında: kuyruk işçisi arada bakiye düşemez, satır numaraları kaymaz"""
+    backend = get_backend()
+    with _lock, backend.commit_lock:
+        keys = list(PARTITIONS)
+        clear_cache(*keys, "archive_manifest")
+        frames = dict(zip(keys, load_many(*keys)))
+        man = load_data("archive_manifest")
+        plan = {}  # arşiv sekmesi -> (anahtar, satırlar)
+        for key, years in cold_rows(frames, today).items():
+            df, ucol = frames[key], PARTITIONS[key][0]
+            # Aynı anahtarlı sıcak satır varsa (aynı saniyede açılan ID) hiçbiri taşınmaz
+            keep = set(df.loc[~df.index.isin(years.index), ucol])
+            years = years[~df.loc[years.index, ucol].isin(keep).to_numpy()]
+            for y, part in df.loc[years.index].groupby(years.to_numpy()): plan[f"{TABS[key]}_{y}"] = (key, part)
+        if not plan: return {}
+        have = dict(zip(plan, backend.read_many([(t, 1) for t in plan])))
+        wb = WriteBatch()
+        for t, (key, part) in plan.items():
+            ucol, dcol, _ = PARTITIONS[key]
+            old = frame_from_values(t, have[t])
+            new = part[~part[ucol].isin(set(old[ucol]))]
+            for r in new.astype(object).values.tolist(): wb.add_row(r, t)
+            if dcol: span = pd.concat([old[dcol], part[dcol]])
+            else: span = pd.Series([pd.Timestamp(int(t[-4:]), 1, 1), pd.Timestamp(int(t[-4:]), 12, 31)])
+            info = {"Arsiv_Sekme": t, "Tablo": TABS[key], "Ilk_Tarih": span.min(), "Son_Tarih": span.max(),
+                    "Satir": len(old) + len(new), "Guncelleme": date.today()}
+            if t in set(man["Arsiv_Sekme"]): wb.update_row("archive_manifest", "Arsiv_Sekme", t, info)
+            else: wb.add_row(list(info.values()), "archive_manifest")
+        # Kuyruğa değil doğrudan: arşiv yazılmadan sıcak satırlar silinmemeli
+        tabs = wb.tabs()
+        try: backend.commit(wb)
+        finally: invalidate(*tabs)
+        moved = {}
+        for t, (key, part) in plan.items():
+            n = backend.delete_where(TABS[key], PARTITIONS[key][0], part[PARTITIONS[key][0]])
+            moved[t] = n; METRICS.count("archived_rows_total", n, tab=TABS[key])
+        invalidate(*[TABS[k] for k in keys])
+        return moved
+
+@st.cache_resource
+def _archive_state():
+    return {"last": 0.0, "frames": {}}  # frames: arşiv sekmesi -> (satır sayısı, df)
+
+def _run_quietly():
+    try: archive_cold()
+    except Exception as e:
+        METRICS.count("storage_errors_total", op="archive", error=type(e).__name__)
+
+def maybe_archive():
+    """Süreç başına günde bir kez arka planda arşivle (ayar: archive_auto=0 kapatır)"""
+    if str(get_setting("archive_auto", "1")) == "0": return
+    h = _archive_state()
+    if time.time() - h["last"] < ARCHIVE_EVERY_HOURS * 3600: return
+    h["last"] = time.time()
+    threading.Thread(target=_run_quietly, name="arsivleme", daemon=True).start()
+
+# --- OKUMA ---
+def archives_for(key, since, until=None):
+    """[since, until] ile kesişen arşiv bölümleri (manifest satırları)"""
+    man = load_data("archive_manifest")
+    m = man[man["Tablo"] == TABS[key]]
+    if since is not None: m = m[m["Son_Tarih"] >= pd.Timestamp(since)]
+    if until is not None: m = m[m["Ilk_Tarih"] <= pd.Timestamp(until)]
+    return m
+
+def load_archives(key, since, until=None):
+    """Arşiv bölümleri değişmez (sadece arşivleme ekler); satır sayısı aynıysa bellekteki kopya kullanılır"""
+    m = archives_for(key, since, until)
+    cache = _archive_state()["frames"]
+    todo = [(t, n) for t, n in zip(m["Arsiv_Sekme"], m["Satir"]) if cache.get(t, (None,))[0] != n]
+    if todo:
+        with METRICS.timer("storage_seconds", op="read_archive", backend=get_backend().name):
+            got = get_backend().read_many([(t, 1) for t, _ in todo])
+        for (t, n), values in zip(todo, got): cache[t] = (n, frame_from_values(t, values))
+    return [cache[t][1] for t in m["Arsiv_Sekme"]]
+
+def load_with_archive(key, since=None, until=None):
+    """Sıcak bölüm; since verilirse [since, until] aralığındaki arşiv satırları da eklenir"""
+    hot = load_data(key)
+    if since is None: return hot
+    dcol = PARTITIONS[key][1]
+    parts = []
+    for p in load_archives(key, since, until):
+        if dcol:
+            p = p[p[dcol] >= pd.Timestamp(since)]
+            if until is not None: p = p[p[dcol] <= pd.Timestamp(until)]
+        parts.append(p)
+    return concat_frames(TABS[key], [hot] + parts).copy()
+
+def archive_version(key, since, until=None):
+    """Türetilmiş yapıların (graf) anahtarı: kullanılan bölümler ve satır sayıları"""
+    if since is None: return ()
+    m = archives_for(key, since, until)
+    return tuple(zip(m["Arsiv_Sekme"], m["Satir"]))
+
+if __name__ == "__main__":
+    # python archive.py run
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "run":
+        print(archive_cold())
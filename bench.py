@@ -0,0 +1,207 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+# --- BENCHMARK (SAHTE GSPREAD ÜZERİNDE GERÇEK AKIŞLAR) ---
+# python bench.py                       -> 1k, 10k, 100k satır/sekme
+# python bench.py --sizes 1000 --latency 50 --json sonuc.json
+# Her akış için: API çağrısı sayısı, süre (ms), tepe bellek (MB). Akışlar uygulamanın kendisiyle
+# (streamlit AppTest) sürülür; yazmalar kuyruk boşalana kadar ölçüme dahildir.
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uretim_online.py")
+SOLIDS = [f"Kati_{i:02d}" for i in range(1, 21)]
+LIQUIDS = [f"Sivi_{i:02d}" for i in range(1, 6)]
+PACKS = ["Koli", "Etiket"]
+PRODUCTS = [f"P{i:03d}" for i in range(1, 21)]
+
+def make_data(n):
+    """Her sekmede ~n satır; reçeteler ve partiler birbirini tutar"""
+    ings = [(h, "Katı") for h in SOLIDS] + [(h, "Sıvı") for h in LIQUIDS] + [(h, "Ambalaj") for h in PACKS]
+    allh = [h for h, _ in ings]
+    prods = []
+    for i, p in enumerate(PRODUCTS):
+        a, b = SOLIDS[i % len(SOLIDS)], SOLIDS[(i + 1) % len(SOLIDS)]
+        prods.append([p, f"Ürün {p}", 10, 12, json.dumps({a: 0.5, b: 0.5}), json.dumps({LIQUIDS[i % len(LIQUIDS)]: 10.0})])
+    inv, prod, fg, sh, cons = [], [], [], [], []
+    for i in range(n):
+        h = allh[i % len(allh)]
+        inv.append([f"STK-{i:07d}", f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}", h, f"{h}-{i}", 1000, 1000 - i % 7, "KG", 100 if h in PACKS else 0, 0])
+    for i in range(n):
+        p = i % len(PRODUCTS); uid = f"URT-{i:07d}"
+        lots = [inv[(p + k * 7) % n] for k in range(3)]
+        det = " | ".join(f"{r[2]}: {r[3]} (5kg)" for r in lots)
+        day = f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}"
+        prod.append([uid, day, PRODUCTS[p], f"UP-{i}", 10, 100, 1, 0.5, 0.1, det])
+        fg.append([uid, PRODUCTS[p], f"UP-{i}", day, "2025-12-31", 100, 100 - i % 50, 10, 0])
+        sh.append([f"S-{i:07d}", day, uid, f"Müşteri {i % 40}", "Satış", 1, ""])
+        cons.append([uid, lots[0][2], lots[0][3], 5])
+    return {
+        "bilesenler": [list(x) for x in ings], "limitler": [[h, 10] for h in allh], "urun_tanimlari": prods,
+        "stok_durumu": inv, "uretim_loglari": prod, "bitmis_urunler": fg, "sevkiyatlar": sh,
+        "tuketim_loglari": cons, "silme_loglari": [], "olay_loglari": []
+    }
+
+class Bench:
+    def __init__(self, n):
+        import storage
+        from streamlit.testing.v1 import AppTest
+        from write_queue import get_write_queue
+        self.n, self.storage, self.AppTest = n, storage, AppTest
+        self.client = storage.get_gsheet_client()
+        self.queue = get_write_queue()
+        sh = self.client.open(storage.SHEET_NAME)
+        for t, rows in make_data(n).items(): sh.seed(t, [list(storage.SCHEMA[t])] + rows)
+        self.results = []
+
+    def cold(self):
+        """Uygulama cache'i ve satır indeksleri boş (yeni süreç gibi)"""
+        self.storage.clear_cache()
+        b = self.storage.get_backend()
+        b.reset_handles(); b.indexes.clear()
+
+    def restart(self):
+        """Yeni süreç ama diskteki anlık görüntü duruyor (yeniden dağıtım sonrası ilk açılış)"""
+        c = self.storage.get_tab_cache()
+        with c.lock: c.entries.clear(); c.versions.clear()
+        b = self.storage.get_backend()
+        b.reset_handles(); b.indexes.clear()
+
+    def app(self, page):
+        at = self.AppTest.from_file(APP, default_timeout=900)
+        at.secrets["admin_password"] = "bench"
+        at.session_state["is_admin"] = True
+        at.run()
+        if page: at.sidebar.radio[0].set_value(page).run()
+        return at
+
+    def measure(self, name, fn):
+        c0 = dict(self.client.calls)
+        tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        err = ""
+        try:
+            at = fn()
+            self.queue.drain(600)
+            if at is not None and (at.exception or at.error): err = str((list(at.exception) + list(at.error))[0].value)[:80]
+        except Exception as e: err = f"{type(e).__name__}: {e}"[:80]
+        wall = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        calls = {k: v - c0.get(k, 0) for k, v in self.client.calls.items() if v - c0.get(k, 0)}
+        r = {"rows": self.n, "workflow": name, "api_calls": sum(calls.values()), "wall_ms": round(wall * 1000, 1),
+             "peak_mb": round(peak / 2**20, 1), "calls": calls, "error": err}
+        self.results.append(r)
+        print(f"{self.n:>7} {name:<34} {r['api_calls']:>5} {r['wall_ms']:>10.1f} {r['peak_mb']:>8.1f}  {err}", flush=True)
+        return r
+
+    # --- AKIŞLAR ---
+    def pages(self):
+        at = self.app(None)
+        for page in at.sidebar.radio[0].options:
+            self.cold()
+            self.measure(f"soğuk sayfa: {page}", lambda: at.sidebar.radio[0].set_value(page).run())
+
+    def production_save(self):
+        at = self.app("📝 Üretim Girişi")
+        at.text_input(key="plt_0").set_value("BENCH-1")
+        at.number_input(key="ppk_0").set_value(1)
+        at.run()
+        for nk in [w.key for w in at.number_input if w.key and w.key.startswith(("k1_", "lf_"))]:
+            at.number_input(key=nk).set_value(5.0)
+            sk = nk.replace("k1_", "kp1_", 1).replace("lf_", "lp_", 1)
+            sb = at.selectbox(key=sk)
+            if len(sb.options) > 1: sb.set_value(sb.options[1])
+        at.run()
+        self.measure("üretim kaydı", lambda: at.button(key="sv_0").click().run())
+
+    def shipment(self):
+        at = self.app("🚚 Sevkiyat")
+        at.text_input(key="scu_0").set_value("Bench")
+        at.number_input(key="skg_0").set_value(1.0)
+        self.measure("sevkiyat", lambda: at.button(key="sbt_0").click().run())
+
+    def stock_delete(self):
+        at = self.app("📦 Hammadde Stok")
+        [t for t in at.text_input if t.label == "Silme Nedeni"][0].set_value("bench")
+        self.measure("stok silme", lambda: [b for b in at.button if b.label == "Sil ve Logla"][0].click().run())
+
+    def retried_deduction(self):
+        """Bakiye yazılır ama geri okuma 429 alır; kuyruk gibi (JSON'dan) tekrar denenir. Düşüm bir kez olmalı"""
+        st_, uid = self.storage, "URT-0000000"
+        def left():
+            fg = st_.frame_from_values("bitmis_urunler", st_.get_backend().read_values("bitmis_urunler"))
+            return float(fg.loc[fg["Uretim_ID"] == uid, "Kalan_Net_KG"].iloc[0])
+        def run():
+            before = left()
+            wb = st_.WriteBatch(); wb.add_to_cell("finished_goods", "Uretim_ID", uid, "Kalan_Net_KG", -10)
+            self.client.fail_after("values_batch_update", "values_batch_get")
+            try: st_.get_backend().commit(wb)
+            except Exception: st_.get_backend().commit(st_.WriteBatch.from_json(wb.to_json()))
+            if abs(left() - (before - 10)) > 1e-3: raise AssertionError(f"düşüm tekrarlandı: {before:g} -> {left():g}")
+        self.measure("bakiye (okuma hatası, tekrar)", run)
+
+    def recipe_edit(self):
+        at = self.app("⚙️ Reçeteler")
+        at.radio(key="op_0").set_value("Düzenle").run()
+        at.text_input(key=f"pn_{PRODUCTS[0]}_0").set_value("Ürün düzenlendi")
+        self.measure("reçete düzenleme", lambda: [b for b in at.button if b.label == "Kaydet"][0].click().run())
+
+    def trace(self):
+        from traceability import get_lot_graph
+        at = self.app("🔍 İzlenebilirlik")
+        at.radio(key="rc_yon").set_value("İleri (Hammadde Partisi → Ürün)").run()
+        sb = at.selectbox(key="rc_lot")
+        self.measure("izlenebilirlik (sayfa)", lambda: sb.set_value(sb.options[-1]).run())
+        g = get_lot_graph()
+        lot = g.raw_lots()[0]
+        self.measure("izlenebilirlik (graf sorgusu)", lambda: g.forward(lot[1], lot[0]) and None)
+
+    def archive(self):
+        """Kapanmış yılları arşive taşı, sonra geçmiş sayfalarını sıcak bölümle tekrar ölç"""
+        from archive import archive_cold
+        self.measure("arşivleme", lambda: archive_cold() and None)
+        at = self.app(None)
+        for page in ["🚚 Sevkiyat", "🔍 İzlenebilirlik"]:
+            self.cold()
+            self.measure(f"soğuk sayfa (arşiv sonrası): {page}", lambda: at.sidebar.radio[0].set_value(page).run())
+
+    def snapshot_start(self):
+        at = self.app(None)
+        for page in at.sidebar.radio[0].options:
+            self.restart()
+            self.measure(f"görüntüden sayfa: {page}", lambda: at.sidebar.radio[0].set_value(page).run())
+
+    def run(self):
+        for f in [self.pages, self.snapshot_start, self.production_save, self.shipment, self.retried_deduction, self.stock_delete,
+                  self.recipe_edit, self.trace, self.archive]:
+            f()
+        return self.results
+
+def main():
+    ap = argparse.ArgumentParser(description="Sahte gspread üzerinde iş akışı benchmark'ı")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--latency", type=float, default=0, help="API çağrısı başına gecikme (ms)")
+    ap.add_argument("--quota", type=int, default=0, help="dakikalık API kotası (0 = sınırsız)")
+    ap.add_argument("--json", help="sonuçları bu dosyaya yaz")
+    args = ap.parse_args()
+    # Uygulama ayarları ortam değişkeninden okunur (get_setting)
+    os.environ["FAKE_GSPREAD"] = "1"
+    os.environ["FAKE_GSPREAD_LATENCY_MS"] = str(args.latency)
+    os.environ["FAKE_GSPREAD_QUOTA_PER_MIN"] = str(args.quota)
+    os.environ["STORAGE_BACKEND"] = "sheets"
+    os.environ["WRITE_QUEUE_PATH"] = os.path.join(tempfile.mkdtemp(), "bench_kuyruk.db")
+    os.environ["SHEETS_WRITES_PER_MIN"] = "100000"  # kuyruğun kota beklemesi ölçümü bozmasın
+    os.environ["ARCHIVE_AUTO"] = "0"  # arşivleme ayrı akış olarak ölçülür
+    os.environ["SNAPSHOT_DIR"] = os.path.join(tempfile.mkdtemp(), "snapshot")
+    sys.path.insert(0, os.path.dirname(APP))
+    tracemalloc.start()
+    print(f"{'satır':>7} {'akış':<34} {'API':>5} {'süre ms':>10} {'tepe MB':>8}")
+    results = []
+    for n in args.sizes: results += Bench(n).run()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(results, f, ensure_ascii=False, indent=1)
+
+if __name__ == "__main__":
+    main()
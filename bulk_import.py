@@ -0,0 +1,188 @@
+import pandas as pd
+import io
+import hashlib
+import argparse
+from storage import SCHEMA, TABS, WriteBatch, get_backend, get_setting, load_many, clear_cache, invalidate
+from write_queue import TokenBucket, queue_enabled, get_write_queue
+from metrics import METRICS
+
+# --- TOPLU AKTARIM (CSV / XLSX) ---
+# Stok girişleri ve eski üretim kayıtları dosyadan parça parça okunur, SCHEMA'ya ve bileşen/ürün listesine göre
+# sütun bazında doğrulanır, kota boyutlu append'lerle yazılır. ID'ler dosya içeriğinden türetilir
+# (STK-<dosya özeti>-<satır>): aynı dosya tekrar yüklenince yazılmış satırlar atlanır, yarıda kalan aktarım sürer.
+# XLSX openpyxl ile read_only modda okunur (requirements.txt); sadece XLSX yüklenince içe aktarılır.
+CHUNK_ROWS = 5000  # okuma parçası
+BATCH_ROWS = 500   # tek append isteğindeki satır
+
+KINDS = {
+    "stok": {"label": "Stok girişi", "key": "inventory", "id": "Stok_ID", "prefix": "STK",
+             "required": ["Tarih", "Hammadde", "Parti_No", "Giris_Miktari"],
+             "defaults": {"Birim": "KG", "Ambalaj_Birim_Gr": 0, "Versiyon": 0},
+             "lookup": {"Hammadde": ("ingredients", "Bilesen_Adi")},
+             "unique": ["Hammadde", "Parti_No"]},
+    "uretim": {"label": "Eski üretim kayıtları", "key": "production", "id": "Uretim_ID", "prefix": "URT",
+               "required": ["Tarih", "Urun_Kodu", "Uretim_Parti_No", "Uretilen_Paket", "Uretilen_Net_KG"],
+               "defaults": {"Fire_Kati_KG": 0, "Fire_Sivi_KG": 0, "Fire_Amb_KG": 0, "Detaylar": ""},
+               "lookup": {"Urun_Kodu": ("products", "Urun_Kodu")},
+               "unique": ["Uretim_Parti_No"]}
+}
+
+def template_csv(kind):
+    """Boş şablon: sadece başlık satırı"""
+    spec = KINDS[kind]
+    return ",".join(c for c in SCHEMA[TABS[spec["key"]]] if c not in (spec["id"], "Versiyon")) + "\n"
+
+# --- OKUMA ---
+def _norm(h):
+    return str(h or "").strip().lower().replace(" ", "_")
+
+def _is_xlsx(name):
+    return name.lower().endswith((".xlsx", ".xlsm"))
+
+def count_rows(data, name):
+    """İlerleme çubuğu için yaklaşık veri satırı sayısı"""
+    if _is_xlsx(name): return 0  # read_only modda satır sayısı güvenilir değil
+    return max(data.count(b"\n") - 1 + (0 if data.endswith(b"\n") else 1), 0)
+
+def read_chunks(data, name, cols, size=CHUNK_ROWS):
+    """Dosyayı parça parça oku -> DataFrame (başlıklar şema adlarına eşlenir, index = dosyadaki veri satırı 0..)"""
+    names = {_norm(c): c for c in cols}
+    start = 0
+    if _is_xlsx(name):
+        import openpyxl
+        ws = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True).active
+        rows = ws.iter_rows(values_only=True)
+        header = [names.get(_norm(h), str(h)) for h in next(rows, [])]
+        buf = []
+        for r in rows:
+            if all(v in (None, "") for v in r): continue
+            buf.append(list(r[:len(header)]) + [None] * (len(header) - len(r)))
+            if len(buf) == size:
+                yield pd.DataFrame(buf, columns=header, index=range(start, start + size)); start += size; buf = []
+        if buf: yield pd.DataFrame(buf, columns=header, index=range(start, start + len(buf)))
+        return
+    # sep=None: ayırıcı (, veya ; - Türkçe Excel) dosyadan tahmin edilir
+    text = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig")
+    for df in pd.read_csv(text, sep=None, engine="python", dtype=str, keep_default_na=False, chunksize=size):
+        df.columns = [names.get(_norm(h), str(h)) for h in df.columns]
+        df.index = range(start, start + len(df)); start += len(df)
+        yield df
+
+# --- DOĞRULAMA ---
+def _key(df, cols):
+    k = df[cols[0]].astype(str)
+    for c in cols[1:]: k = k + "\x1f" + df[c].astype(str)
+    return k
+
+def context(kind):
+    """Doğrulama için güncel veriler: hedef sekmedeki ID'ler ve tekil anahtarlar, bileşen/ürün listeleri"""
+    spec = KINDS[kind]
+    keys = [spec["key"]] + [k for k, _ in spec["lookup"].values()]
+    clear_cache(*keys)
+    frames = dict(zip(keys, load_many(*keys)))
+    target = frames[spec["key"]]
+    return {"ids": set(target[spec["id"]]), "keys": set(_key(target, spec["unique"])), "seen": set(),
+            "lookup": {c: set(frames[k][col]) for c, (k, col) in spec["lookup"].items()}}
+
+def validate(kind, df, ctx, job):
+    """Parçayı sütun bazında doğrula -> (yazılacak satırlar, hatalar [(satır, mesaj)], daha önce yazılmış satır sayısı)"""
+    spec = KINDS[kind]
+    types = SCHEMA[TABS[spec["key"]]]
+    err = pd.Series("", index=df.index, dtype=object)
+    def bad(mask, msg): err[mask & (err == "")] = msg  # satır başına ilk hata
+    out = pd.DataFrame(index=df.index)
+    blanks = {}
+    out[spec["id"]] = spec["prefix"] + "-" + job + "-" + pd.Series(df.index + 1, index=df.index).map("{:06d}".format)
+    for c, kind_ in types.items():
+        if c == spec["id"]: continue
+        raw = df[c] if c in df.columns else pd.Series("", index=df.index)
+        text = raw.where(raw.notna(), "").astype(str).str.strip()
+        blank = blanks[c] = text == ""
+        if c in spec["required"]: bad(blank, f"{c} boş")
+        if kind_ == "float32":
+            v = pd.to_numeric(text.str.replace(",", "."), errors="coerce")
+            bad(v.isna() & ~blank, f"{c} sayı değil"); bad(v < 0, f"{c} negatif")
+            out[c] = v.fillna(spec["defaults"].get(c, 0))
+        elif kind_ == "date":
+            # Önce ISO (2024-03-05), kalanlar gün önce (05.03.2024 / 05/03/2024)
+            v = pd.to_datetime(text.where(~blank), format="ISO8601", errors="coerce")
+            rest = v.isna() & ~blank
+            if rest.any(): v[rest] = pd.to_datetime(text[rest], format="mixed", dayfirst=True, errors="coerce")
+            bad(v.isna() & ~blank, f"{c} tarih değil")
+            out[c] = v.dt.strftime("%Y-%m-%d").fillna("")
+        else:
+            out[c] = text.where(~blank, str(spec["defaults"].get(c, "")))
+    # Kalan boş (veya sütun yok): yeni parti, kalan = giriş. 0 yazılırsa parti bitmiş sayılıp arşivlenir
+    if "Kalan_Miktar" in types: out["Kalan_Miktar"] = out["Kalan_Miktar"].mask(blanks["Kalan_Miktar"], out["Giris_Miktari"])
+    for c, known in ctx["lookup"].items(): bad(~out[c].isin(known) & (out[c] != ""), f"{c} tanımlı değil")
+    # Daha önce bu dosyadan yazılmış satır: hata değil, atlanır (kaldığı yerden devam)
+    done = out[spec["id"]].isin(ctx["ids"])
+    key = _key(out, spec["unique"])
+    bad(~done & key.isin(ctx["keys"]), " + ".join(spec["unique"]) + " zaten kayıtlı")
+    bad(~done & (key.duplicated() | key.isin(ctx["seen"])), " + ".join(spec["unique"]) + " dosyada tekrar ediyor")
+    ctx["seen"].update(key[~done])
+    errors = list(zip((err.index[err != ""] + 2).tolist(), err[err != ""].tolist()))  # +2: başlık ve 1'den sayım
+    ok = out[(err == "") & ~done]
+    return ok[list(types)], errors, int(done.sum())
+
+# --- YAZMA ---
+def run_import(kind, data, name, dry_run=False, skip_invalid=False, progress=None):
+    """Dosyayı aktar -> rapor. Hata varsa (skip_invalid değilse) hiçbir satır yazılmaz.
+    progress(yazılan, toplam) her parçadan sonra çağrılır"""
+    spec = KINDS[kind]
+    tab, cols = TABS[spec["key"]], list(SCHEMA[TABS[spec["key"]]])
+    job = hashlib.sha1(data).hexdigest()[:8]
+    rep = {"rows": 0, "written": 0, "existing": 0, "errors": [], "job": job}
+
+    def scan():
+        ctx = context(kind)
+        for df in read_chunks(data, name, cols):
+            missing = [c for c in spec["required"] if c not in df.columns]
+            if missing: raise ValueError(f"Eksik sütun: {', '.join(missing)}")
+            yield df, validate(kind, df, ctx, job)
+
+    # 1. geçiş: sadece doğrulama
+    if not skip_invalid or dry_run:
+        for df, (ok, errors, existing) in scan():
+            rep["rows"] += len(df); rep["existing"] += existing; rep["errors"] += errors
+        if dry_run or rep["errors"]: return rep
+        rep.update(rows=0, existing=0)
+    # 2. geçiş: yaz. Kuyruk açıksa aynı kota kovası paylaşılır
+    bucket = get_write_queue().bucket if queue_enabled() else TokenBucket(float(get_setting("sheets_writes_per_min", 60)))
+    backend, total = get_backend(), count_rows(data, name)
+    for df, (ok, errors, existing) in scan():
+        rep["rows"] += len(df); rep["existing"] += existing; rep["errors"] += errors
+        rows = ok.astype(object).values.tolist()
+        for i in range(0, len(rows), BATCH_ROWS):
+            wb = WriteBatch()
+            for r in rows[i:i + BATCH_ROWS]: wb.add_row(r, spec["key"])
+            bucket.take(1)
+            # Doğrudan yazılır (kuyruğa değil): ilerleme gerçek yazmayı göstersin, hata olursa aktarım durur
+            try:
+                with METRICS.timer("storage_seconds", op="import", backend=backend.name): backend.commit(wb)
+            finally: invalidate(tab)
+            n = min(BATCH_ROWS, len(rows) - i)
+            rep["written"] += n; METRICS.count("import_rows_total", n, tab=tab)
+            if progress: progress(rep["written"] + rep["existing"], total)
+        if progress: progress(rep["written"] + rep["existing"], total)
+    return rep
+
+def main():
+    ap = argparse.ArgumentParser(description="CSV/XLSX'ten toplu stok girişi veya eski üretim kayıtları")
+    ap.add_argument("kind", choices=list(KINDS))
+    ap.add_argument("file")
+    ap.add_argument("--dry-run", action="store_true", help="sadece doğrula, yazma")
+    ap.add_argument("--skip-invalid", action="store_true", help="hatalı satırları atla, kalanları yaz")
+    ap.add_argument("--errors", help="hataları bu CSV dosyasına yaz")
+    args = ap.parse_args()
+    with open(args.file, "rb") as f: data = f.read()
+    rep = run_import(args.kind, data, args.file, args.dry_run, args.skip_invalid,
+                     progress=lambda done, total: print(f"\r{done}/{total or '?'}", end="", flush=True))
+    print(f"\nsatır: {rep['rows']}  yazılan: {rep['written']}  önceden yazılmış: {rep['existing']}  hatalı: {len(rep['errors'])}")
+    for line, msg in rep["errors"][:20]: print(f"  satır {line}: {msg}")
+    if args.errors and rep["errors"]:
+        pd.DataFrame(rep["errors"], columns=["Satir", "Hata"]).to_csv(args.errors, index=False)
+
+if __name__ == "__main__":
+    # python bulk_import.py stok teslimat.csv [--dry-run] [--skip-invalid] [--errors hatalar.csv]
+    main()
@@ -0,0 +1,264 @@
+import re
+import threading
+import time
+from collections import Counter, deque
+from gspread.exceptions import APIError, WorksheetNotFound
+
+# --- SAHTE GSPREAD (BELLEKTE) ---
+# Client / Spreadsheet / Worksheet API'sinin uygulamanın kullandığı kısmı. Google hesabı olmadan
+# test ve benchmark için: her çağrı sayılır, istenirse gecikme ve dakikalık kota uygulanır.
+# Ayar: fake_gspread=1 (get_gsheet_client bunu döner), fake_gspread_latency_ms, fake_gspread_quota_per_min
+
+def _col_num(letters):
+    n = 0
+    for ch in letters: n = n * 26 + ord(ch.upper()) - 64
+    return n
+
+def _parse_range(rng):
+    """"'sekme'!A2:C" -> (sekme, r1, c1, r2, c2); eksik sınırlar None"""
+    if "!" in rng: title, part = rng.rsplit("!", 1)
+    else: title, part = rng, ""
+    title = title.strip("'")
+    if not part: return title, 1, 1, None, None
+    def one(p):
+        m = re.match(r"^\$?([A-Za-z]*)\$?(\d*)$", p)
+        return (int(m.group(2)) if m.group(2) else None), (_col_num(m.group(1)) if m.group(1) else None)
+    pieces = part.split(":")
+    r1, c1 = one(pieces[0])
+    if len(pieces) == 1: return title, r1 or 1, c1 or 1, r1, c1
+    r2, c2 = one(pieces[1])
+    return title, r1 or 1, c1 or 1, r2, c2
+
+def _enter(v):
+    # USER_ENTERED: sayıya benzeyen metin sayı olur
+    if isinstance(v, str):
+        s = v.strip()
+        if re.match(r"^-?\d+$", s): return int(s)
+        if re.match(r"^-?\d*\.\d+(e-?\d+)?$", s): return float(s)
+    return v
+
+def _fmt(v):
+    if v is None: return ""
+    if isinstance(v, bool): return "TRUE" if v else "FALSE"
+    if isinstance(v, float) and v.is_integer(): return str(int(v))
+    return str(v)
+
+class _Response:
+    """APIError için en küçük cevap nesnesi"""
+    def __init__(self, code, message):
+        self.status_code = code; self.text = message
+    def json(self):
+        return {"error": {"code": self.status_code, "message": self.text, "status": "RESOURCE_EXHAUSTED"}}
+
+class Client:
+    def __init__(self, latency_ms=0, quota_per_min=0):
+        self.latency = latency_ms / 1000.0
+        self.quota = quota_per_min
+        self.calls = Counter()  # metot adı -> çağrı sayısı
+        self.recent = deque()
+        self.files = {}
+        self.faults = []  # [sonra_gelen_metot, düşecek_metot, kuruldu_mu]
+        self.lock = threading.RLock()
+
+    def _call(self, name):
+        """Her API çağrısında: say, kota kontrolü, gecikme"""
+        with self.lock:
+            self.calls[name] += 1
+            for f in self.faults:
+                if f[2] and f[1] == name:
+                    self.faults.remove(f); raise APIError(_Response(429, "Injected failure (fake)"))
+                if f[0] == name: f[2] = True
+            now = time.time()
+            while self.recent and self.recent[0] < now - 60: self.recent.popleft()
+            if self.quota and len(self.recent) >= self.quota:
+                raise APIError(_Response(429, "Quota exceeded (fake)"))
+            self.recent.append(now)
+        if self.latency: time.sleep(self.latency)
+
+    def fail_after(self, after, name):
+        """Hata enjeksiyonu: sıradaki `after` çağrısından sonraki ilk `name` çağrısı 429 ile düşer"""
+        with self.lock: self.faults.append([after, name, False])
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def open(self, title):
+        self._call("open")
+        with self.lock:
+            if title not in self.files: self.files[title] = Spreadsheet(self, title)
+            return self.files[title]
+
+class Spreadsheet:
+    def __init__(self, client, title):
+        self.client = client; self.title = title; self.id = f"fake-{title}"
+        self.sheets = {}; self.next_id = 1
+        self.modified = 0.0; self.touch()
+
+    def touch(self):
+        # Drive'daki modifiedTime gibi: her yazmada ilerler
+        self.modified = max(time.time(), self.modified + 1e-6)
+
+    def get_lastUpdateTime(self):
+        self.client._call("get_lastUpdateTime")
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(self.modified)) + f".{int(self.modified % 1 * 1e6):06d}Z"
+
+    def _ws(self, rng):
+        title = _parse_range(rng)[0]
+        if title not in self.sheets: raise WorksheetNotFound(title)
+        return self.sheets[title]
+
+    def seed(self, title, rows):
+        """API sayacına yansımadan sekme doldur (benchmark hazırlığı)"""
+        ws = self.sheets.get(title) or self._add(title)
+        ws.rows = [list(r) for r in rows]; self.touch()
+        return ws
+
+    def _add(self, title):
+        ws = Worksheet(self, title, self.next_id); self.next_id += 1
+        self.sheets[title] = ws; self.touch()
+        return ws
+
+    def worksheets(self):
+        self.client._call("worksheets")
+        return list(self.sheets.values())
+
+    def worksheet(self, title):
+        self.client._call("worksheet")
+        if title not in self.sheets: raise WorksheetNotFound(title)
+        return self.sheets[title]
+
+    def add_worksheet(self, title, rows=1000, cols=20, **kw):
+        self.client._call("add_worksheet")
+        with self.client.lock: return self._add(title)
+
+    def values_get(self, rng, params=None):
+        self.client._call("values_get")
+        return self._values_get(rng, params)
+
+    def _values_get(self, rng, params=None):
+        ws = self._ws(rng); _, r1, c1, r2, c2 = _parse_range(rng)
+        fmt = (params or {}).get("valueRenderOption", "FORMATTED_VALUE") != "UNFORMATTED_VALUE"
+        return {"range": rng, "values": ws._get(r1, c1, r2, c2, fmt=fmt)}
+
+    def values_batch_get(self, ranges, params=None):
+        self.client._call("values_batch_get")
+        return {"valueRanges": [self._values_get(r, params) for r in ranges]}
+
+    def values_update(self, rng, params=None, body=None):
+        self.client._call("values_update")
+        ws = self._ws(rng); _, r, c, _, _ = _parse_range(rng)
+        ws._set(r, c, body["values"], raw=(params or {}).get("valueInputOption") == "RAW")
+
+    def values_batch_update(self, body=None):
+        self.client._call("values_batch_update")
+        raw = body.get("valueInputOption") == "RAW"
+        with self.client.lock:
+            for d in body.get("data", []):
+                ws = self._ws(d["range"]); _, r, c, _, _ = _parse_range(d["range"])
+                ws._set(r, c, d["values"], raw=raw)
+        return {"totalUpdatedCells": sum(len(v) for d in body.get("data", []) for v in d["values"])}
+
+    def values_append(self, rng, params, body):
+        self.client._call("values_append")
+        return self._ws(rng)._append(body["values"], raw=(params or {}).get("valueInputOption", "RAW") == "RAW")
+
+    def values_clear(self, rng):
+        self.client._call("values_clear")
+        self._ws(rng).rows = []; self.touch()
+
+    def batch_update(self, body):
+        self.client._call("batch_update")
+        by_id = {w.id: w for w in self.sheets.values()}
+        with self.client.lock:
+            for req in body.get("requests", []):
+                if "deleteDimension" in req:
+                    rg = req["deleteDimension"]["range"]
+                    del by_id[rg["sheetId"]].rows[rg["startIndex"]:rg["endIndex"]]
+                elif "addSheet" in req:
+                    self._add(req["addSheet"]["properties"]["title"])
+            self.touch()
+        return {"replies": []}
+
+class Worksheet:
+    def __init__(self, spreadsheet, title, sid):
+        self.spreadsheet = spreadsheet; self.client = spreadsheet.client
+        self.title = title; self.id = sid
+        self.rows = []
+
+    def _last_row(self):
+        n = len(self.rows)
+        while n and all(v in ("", None) for v in self.rows[n - 1]): n -= 1
+        return n
+
+    def _get(self, r1, c1, r2, c2, fmt=True):
+        last = self._last_row()
+        r2 = last if r2 is None else min(r2, last)
+        out = []
+        for r in range(r1, r2 + 1):
+            row = self.rows[r - 1]
+            vals = row[c1 - 1:(len(row) if c2 is None else min(c2, len(row)))]
+            while vals and vals[-1] in ("", None): vals = vals[:-1]
+            out.append([_fmt(v) for v in vals] if fmt else list(vals))
+        while out and not out[-1]: out.pop()
+        return out
+
+    def _set(self, r1, c1, values, raw=False):
+        self.spreadsheet.touch()
+        for i, row in enumerate(values):
+            r = r1 + i
+            while len(self.rows) < r: self.rows.append([])
+            cur = self.rows[r - 1]
+            for j, v in enumerate(row):
+                c = c1 + j
+                while len(cur) < c: cur.append("")
+                cur[c - 1] = v if raw else _enter(v)
+
+    def _append(self, values, raw=False):
+        with self.client.lock:
+            start = self._last_row() + 1
+            self._set(start, 1, values, raw=raw)
+        return {"updates": {"updatedRange": f"'{self.title}'!A{start}:Z{start + len(values) - 1}", "updatedRows": len(values)}}
+
+    def get_all_values(self, **kw):
+        self.client._call("get_all_values")
+        return self._get(1, 1, None, None)
+
+    def get_all_records(self, **kw):
+        self.client._call("get_all_records")
+        vals = self._get(1, 1, None, None, fmt=False)
+        if not vals: return []
+        head = [_fmt(h) for h in vals[0]]
+        return [{h: (r[i] if i < len(r) else "") for i, h in enumerate(head)} for r in vals[1:]]
+
+    def append_row(self, values, value_input_option="RAW", **kw):
+        self.client._call("append_row")
+        return self._append([values], raw=value_input_option == "RAW")
+
+    def append_rows(self, values, value_input_option="RAW", **kw):
+        self.client._call("append_rows")
+        return self._append(values, raw=value_input_option == "RAW")
+
+    def update_cell(self, row, col, value):
+        self.client._call("update_cell")
+        self._set(row, col, [[value]])
+
+    def update(self, values=None, range_name=None, **kw):
+        self.client._call("update")
+        if isinstance(values, str) and isinstance(range_name, list): values, range_name = range_name, values
+        r, c = (1, 1) if not range_name else _parse_range(range_name)[1:3]
+        self._set(r, c, values)
+
+    def clear(self):
+        self.client._call("clear")
+        self.rows = []; self.spreadsheet.touch()
+
+    def delete_rows(self, start, end=None):
+        self.client._call("delete_rows")
+        del self.rows[start - 1:(end or start)]; self.spreadsheet.touch()
+
+_shared = {}
+
+def shared_client(latency_ms=0, quota_per_min=0):
+    """Süreç boyunca tek sahte client (uygulama ve benchmark aynı veriyi görsün)"""
+    if "client" not in _shared: _shared["client"] = Client(latency_ms, quota_per_min)
+    return _shared["client"]
@@ -0,0 +1,47 @@
+import pandas as pd
+from storage import load_many, data_version, memo
+
+# --- KULLANILABİLİR PARTİ İNDEKSİ ---
+# Stok bir kez Hammadde'ye göre gruplanır; seçim kutuları, etiketler ve kayıttaki Stok_ID araması
+# her hammadde için tüm stoğu yeniden taramaz. Stok versiyonu değişince yeniden kurulur.
+
+class LotIndex:
+    """Hammadde -> kalanı olan partiler; (Hammadde, Parti_No) -> Stok_ID"""
+    def __init__(self, inv):
+        # Tipler load_data'dan gelir (Kalan_Miktar float32, Parti_No metin, Hammadde kategori)
+        avail = inv[inv["Kalan_Miktar"] > 0].reset_index(drop=True)
+        avail["Etiket"] = avail["Parti_No"] + " (" + avail["Kalan_Miktar"].astype(str) + ")"
+        self.avail = avail
+        self.groups = avail.groupby("Hammadde", observed=True).indices
+        # Önce kalanı olan satır, yoksa ilk satır
+        both = pd.concat([avail, inv], ignore_index=True).drop_duplicates(["Hammadde", "Parti_No"])
+        self.stok_ids = dict(zip(zip(both["Hammadde"], both["Parti_No"]), both["Stok_ID"]))
+        self._labels, self._records = {}, {}
+
+    def lots(self, ham):
+        """Hammaddenin kalanı olan stok satırları"""
+        return self.avail.iloc[self.groups.get(ham, [])]
+
+    def labels(self, ham):
+        """'Parti (Kalan)' etiketleri ve etiket -> Parti_No eşlemesi"""
+        if ham not in self._labels:
+            g = self.lots(ham)
+            self._labels[ham] = (g["Etiket"].tolist(), dict(zip(g["Etiket"], g["Parti_No"])))
+        return self._labels[ham]
+
+    def lot_of(self, ham, label):
+        """Seçilen etiketin Parti_No'su; seçim yoksa etiketin kendisi ('Seç...')"""
+        return self.labels(ham)[1].get(label, label)
+
+    def records(self, ham):
+        """Ambalaj seçimi için satır sözlükleri"""
+        if ham not in self._records: self._records[ham] = self.lots(ham).to_dict("records")
+        return self._records[ham]
+
+    def stok_id(self, ham, lot):
+        return self.stok_ids[(ham, str(lot))]
+
+def get_lot_index():
+    """Stok değişmedikçe aynı indeks kullanılır"""
+    inv, = load_many("inventory")
+    return memo("lot_index", data_version("inventory"), lambda: LotIndex(inv))
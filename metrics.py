@@ -0,0 +1,131 @@
+import threading
+import time
+import json
+from collections import deque, defaultdict
+from contextlib import contextmanager
+
+# --- ÖLÇÜMLER (SAYAÇ / SÜRE / KOTA) ---
+# Süreç genelinde tek kayıt defteri; depolama çağrıları ve sayfa bölümleri buraya yazar.
+# Yönetici panelinde gösterilir, JSON veya Prometheus metni olarak indirilebilir.
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+WINDOW = 500  # yüzdelikler için son N ölçüm
+READ_METHODS = {"values_get", "values_batch_get", "worksheets", "get_all_values", "get_all_records", "fetch_sheet_metadata", "open"}
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0; self.n = 0
+        self.recent = deque(maxlen=WINDOW)
+
+    def observe(self, v):
+        i = 0
+        while i < len(BUCKETS) and v > BUCKETS[i]: i += 1
+        self.counts[i] += 1; self.total += v; self.n += 1
+        self.recent.append(v)
+
+    def quantile(self, q):
+        if not self.recent: return 0.0
+        s = sorted(self.recent)
+        return s[min(len(s) - 1, int(q * len(s)))]
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.hists = defaultdict(Histogram)
+        self.api_times = {"read": deque(), "write": deque()}  # son 60 sn'lik istek zamanları
+        self.started = time.time()
+
+    def count(self, name, n=1, **labels):
+        with self.lock: self.counters[_key(name, labels)] += n
+
+    def observe(self, name, seconds, **labels):
+        with self.lock: self.hists[_key(name, labels)].observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        t0 = time.perf_counter()
+        try: yield
+        finally: self.observe(name, time.perf_counter() - t0, **labels)
+
+    def api_call(self, method, seconds):
+        """Sheets API isteği: sayaç + süre + dakikalık kota penceresi"""
+        kind = "read" if method in READ_METHODS else "write"
+        now = time.time()
+        with self.lock:
+            self.counters[_key("sheets_api_calls_total", {"method": method, "kind": kind})] += 1
+            self.hists[_key("sheets_api_seconds", {"method": method})].observe(seconds)
+            q = self.api_times[kind]; q.append(now)
+            while q and q[0] < now - 60: q.popleft()
+
+    def quota(self):
+        """Son 60 saniyedeki okuma/yazma istek sayısı"""
+        now = time.time()
+        with self.lock:
+            for q in self.api_times.values():
+                while q and q[0] < now - 60: q.popleft()
+            return {k: len(q) for k, q in self.api_times.items()}
+
+    def total(self, name, **match):
+        """Etiketleri eşleşen sayaçların toplamı"""
+        with self.lock:
+            return sum(v for (n, lb), v in self.counters.items() if n == name and all(dict(lb).get(k) == x for k, x in match.items()))
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear(); self.hists.clear()
+            for q in self.api_times.values(): q.clear()
+            self.started = time.time()
+
+    # --- ÇIKTI ---
+    def snapshot(self):
+        with self.lock:
+            counters = [{"name": n, "labels": dict(lb), "value": v} for (n, lb), v in sorted(self.counters.items())]
+            hists = [{"name": n, "labels": dict(lb), "count": h.n, "sum": h.total,
+                      "p50": h.quantile(0.5), "p95": h.quantile(0.95), "p99": h.quantile(0.99),
+                      "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], h.counts))}
+                     for (n, lb), h in sorted(self.hists.items())]
+        return {"since": self.started, "counters": counters, "histograms": hists, "quota_last_60s": self.quota()}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=1)
+
+    def to_prometheus(self):
+        def lbl(d, extra=None):
+            d = {**d, **(extra or {})}
+            return "{" + ",".join(f'{k}="{str(v)}"' for k, v in d.items()) + "}" if d else ""
+        snap, out = self.snapshot(), []
+        for c in snap["counters"]: out.append(f"uretim_{c['name']}{lbl(c['labels'])} {c['value']}")
+        for h in snap["histograms"]:
+            cum = 0
+            for b, n in h["buckets"].items():
+                cum += n; out.append(f"uretim_{h['name']}_bucket{lbl(h['labels'], {'le': b})} {cum}")
+            out.append(f"uretim_{h['name']}_sum{lbl(h['labels'])} {h['sum']}")
+            out.append(f"uretim_{h['name']}_count{lbl(h['labels'])} {h['count']}")
+        for k, v in snap["quota_last_60s"].items(): out.append(f'uretim_sheets_requests_last_minute{{kind="{k}"}} {v}')
+        return "\n".join(out) + "\n"
+
+METRICS = Metrics()
+
+class Instrumented:
+    """gspread nesnesi sarmalayıcısı: her API metodu çağrısı sayılır ve süresi ölçülür"""
+    API = READ_METHODS | {"values_update", "values_batch_update", "values_append", "values_clear", "batch_update",
+                          "add_worksheet", "append_row", "append_rows", "update", "update_cell", "clear", "delete_rows"}
+
+    def __init__(self, obj):
+        self._obj = obj
+
+    def __getattr__(self, name):
+        attr = getattr(self._obj, name)
+        if name not in self.API or not callable(attr): return attr
+        def call(*a, **k):
+            t0 = time.perf_counter()
+            try: res = attr(*a, **k)
+            finally: METRICS.api_call(name, time.perf_counter() - t0)
+            if name == "add_worksheet": return Instrumented(res)
+            if name == "worksheets": return [Instrumented(w) for w in res]
+            return res
+        return call
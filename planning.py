@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from storage import WriteBatch
+from traceability import consumption_rows
+
+# --- ÜRETİM PLANI (FIFO PARTİ DAĞITIMI) ---
+# Sipariş listesi (ürün, paket) için hammadde ihtiyacı reçete matrisinden gelir; partiler en eskiden başlayarak
+# tek geçişte dağıtılır. Her hammadde ortak bir eksende kendi aralığını alır: siparişlerin birikimli ihtiyacı ile
+# partilerin birikimli kalanı üst üste konur, kesişen parçalar (sipariş, parti) miktarıdır, partisiz kalan parça eksiktir.
+# Hammaddede son kullanma tarihi tutulmadığı için sıra giriş tarihidir (FEFO yerine FIFO).
+EPS = 1e-9
+
+def _spans(item, qty, base):
+    """Hammadde aralığı içinde art arda [başlangıç, bitiş) dilimleri"""
+    end = base[item] + pd.Series(qty).groupby(item).cumsum().to_numpy()
+    return end - qty, end
+
+def _overlap(need, lots):
+    """need: (Hammadde, Sira) sıralı ihtiyaç, lots: (Hammadde, en eski önce) sıralı partiler; ikisinde de Miktar
+    -> need satırı, parti satırı (-1: eksik), Miktar"""
+    items = pd.Index(sorted(set(need["Hammadde"]) | set(lots["Hammadde"])))
+    d_item, s_item = items.get_indexer(need["Hammadde"]), items.get_indexer(lots["Hammadde"])
+    d_qty, s_qty = need["Miktar"].to_numpy(float), lots["Miktar"].to_numpy(float)
+    span = np.maximum(np.bincount(d_item, d_qty, len(items)), np.bincount(s_item, s_qty, len(items)))
+    base = np.concatenate([[0.0], np.cumsum(span)[:-1]])
+    d0, d1 = _spans(d_item, d_qty, base)
+    s0, s1 = _spans(s_item, s_qty, base)
+    cuts = np.unique(np.concatenate([d0, d1, s0, s1]))
+    mid, length = (cuts[:-1] + cuts[1:]) / 2, np.diff(cuts)
+    di = np.searchsorted(d1, mid, side="right"); si = np.searchsorted(s1, mid, side="right")
+    keep = (di < len(d1)) & (length > EPS)
+    keep[keep] &= d0[di[keep]] <= mid[keep]
+    di, si, mid, length = di[keep], si[keep], mid[keep], length[keep]
+    has_lot = si < len(s1)
+    has_lot[has_lot] &= s0[si[has_lot]] <= mid[has_lot]
+    out = pd.DataFrame({"need": di, "lot": np.where(has_lot, si, -1), "Miktar": length})
+    return out.groupby(["need", "lot"], as_index=False, sort=True)["Miktar"].sum()
+
+class Plan:
+    """Dağıtım sonucu: alloc (sipariş x parti), short (sipariş x hammadde eksik), summary (hammadde toplamları)"""
+    def __init__(self, orders, alloc, short):
+        self.orders, self.alloc, self.short = orders, alloc, short
+
+    @property
+    def ok(self):
+        return self.short.empty
+
+    def summary(self):
+        """Hammadde başına gerekli / ayrılan / eksik (ambalajda adet, diğerlerinde kg)"""
+        both = pd.concat([self.alloc[["Hammadde", "Birim"]], self.short[["Hammadde", "Birim"]]]).drop_duplicates("Hammadde")
+        out = pd.DataFrame({"Birim": both.set_index("Hammadde")["Birim"],
+                            "Ayrilan": self.alloc.groupby("Hammadde")["Miktar"].sum(),
+                            "Eksik": self.short.groupby("Hammadde")["Eksik"].sum()})
+        out[["Ayrilan", "Eksik"]] = out[["Ayrilan", "Eksik"]].fillna(0.0)
+        out.insert(1, "Gerekli", out["Ayrilan"] + out["Eksik"])
+        return out.sort_index()
+
+    def lots_for(self, sira):
+        """Tek siparişin hammadde -> [(Parti_No, kg, miktar)] listesi (forma aktarma)"""
+        a = self.alloc[self.alloc["Sira"] == sira]
+        return {h: list(zip(g["Parti_No"], g["Miktar_KG"], g["Miktar"])) for h, g in a.groupby("Hammadde", sort=False)}
+
+def allocate(book, inv, orders, packaging=()):
+    """orders: Urun_Kodu, Paket, isteğe bağlı Ambalaj (siparişte paket başına birer adet kullanılan ambalajlar);
+    sıra = öncelik. packaging: tüm ambalaj hammaddeleri (adet olarak dağıtılır)"""
+    orders = orders[orders["Paket"] > 0].reset_index(drop=True)
+    orders["Sira"] = np.arange(len(orders))
+    ts, tl = book.theoretical(orders["Urun_Kodu"], orders["Paket"])
+    orders["Net_KG"] = orders["Paket"].to_numpy(float) * np.array([book.net[book.pos[str(c)]] for c in orders["Urun_Kodu"]])
+    # İhtiyaç: katı/sıvı kg, ambalaj adet (aynı hammaddede birimler karışmaz)
+    used = orders["Ambalaj"] if "Ambalaj" in orders else pd.Series([()] * len(orders))
+    pk = pd.DataFrame({p: np.where([p in (u if isinstance(u, (list, tuple, set)) else ()) for u in used], orders["Paket"].to_numpy(float), 0.0)
+                       for p in packaging})
+    need = pd.concat([ts, tl, pk], axis=1).rename_axis("Sira").reset_index()
+    need = need.melt(id_vars="Sira", var_name="Hammadde", value_name="Miktar")
+    need = need[need["Miktar"] > EPS].sort_values(["Hammadde", "Sira"], ignore_index=True)
+    # Partiler: kalanı olan, en eski önce; ambalaj partisi adede çevrilir
+    lots = inv[(inv["Kalan_Miktar"] > 0) & inv["Hammadde"].isin(set(need["Hammadde"]))].copy()
+    lots["Hammadde"] = lots["Hammadde"].astype(str)
+    pack = lots["Hammadde"].isin(set(packaging))
+    lots["Birim_KG"] = np.where(pack, lots["Ambalaj_Birim_Gr"].astype(float) / 1000, 1.0)
+    lots["Miktar"] = lots["Kalan_Miktar"].astype(float) / lots["Birim_KG"].where(lots["Birim_KG"] > 0)
+    lots["Miktar"] = np.where(pack, np.floor(lots["Miktar"] + EPS), lots["Miktar"])
+    lots = lots[lots["Miktar"] > 0]  # birim ağırlığı girilmemiş ambalaj partisi adede çevrilemez
+    lots = lots.sort_values(["Hammadde", "Tarih", "Stok_ID"], na_position="last").reset_index(drop=True)
+    parts = _overlap(need, lots)
+    nrow = need.iloc[parts["need"]].reset_index(drop=True)
+    got = parts["lot"].to_numpy() >= 0
+    a = lots.iloc[parts["lot"][got]].reset_index(drop=True)
+    qty = parts["Miktar"][got].to_numpy()
+    unit = lambda h: np.where(np.isin(h, list(packaging)), "Adet", "KG")
+    alloc = pd.DataFrame({"Sira": nrow["Sira"][got].to_numpy(), "Hammadde": a["Hammadde"], "Stok_ID": a["Stok_ID"],
+                          "Parti_No": a["Parti_No"], "Miktar": qty, "Birim": unit(a["Hammadde"].to_numpy(object)),
+                          "Miktar_KG": qty * a["Birim_KG"].to_numpy()})
+    alloc.insert(1, "Urun_Kodu", orders["Urun_Kodu"].to_numpy()[alloc["Sira"]])
+    short = pd.DataFrame({"Sira": nrow["Sira"][~got].to_numpy(), "Hammadde": nrow["Hammadde"][~got].to_numpy(),
+                          "Eksik": parts["Miktar"][~got].to_numpy()})
+    short["Birim"] = unit(short["Hammadde"].to_numpy(object))
+    return Plan(orders, alloc, short)
+
+def plan_batch(plan, prods, details):
+    """Planı tek WriteBatch'e çevir. details: Sira -> (Uretim_Parti_No, tarih). Fire 0 (fiili = teorik)"""
+    wb, stamp = WriteBatch(), datetime.now().strftime('%Y%m%d%H%M%S')
+    shelf = dict(zip(prods["Urun_Kodu"].astype(str), prods["Raf_Omru_Ay"]))
+    pack = dict(zip(prods["Urun_Kodu"].astype(str), prods["Net_Paket_KG"]))
+    for o in plan.orders.itertuples():
+        uid = f"URT-{stamp}-{o.Sira + 1:03d}"
+        lot_no, day = details[o.Sira]
+        a = plan.alloc[plan.alloc["Sira"] == o.Sira]
+        text = " | ".join(f"{h}: {p} ({round(k, 3)}kg)" for h, p, k in zip(a["Hammadde"], a["Parti_No"], a["Miktar_KG"]))
+        wb.add_row([uid, str(day), o.Urun_Kodu, lot_no, int(o.Paket), o.Net_KG, 0.0, 0.0, 0.0, text], "production")
+        inp = {}
+        for h, p, k in zip(a["Hammadde"], a["Parti_No"], a["Miktar_KG"]): inp.setdefault(h, []).append({"qty": k, "lot": p})
+        for r in consumption_rows(uid, inp): wb.add_row(r, "consumption")
+        skt = day + timedelta(days=int(float(shelf[o.Urun_Kodu]) * 30))
+        wb.add_row([uid, o.Urun_Kodu, lot_no, str(day), str(skt), o.Net_KG, o.Net_KG, float(pack[o.Urun_Kodu])], "finished_goods")
+    # Aynı partiden birden çok üretim düşerse tek artış
+    for sid, kg in plan.alloc.groupby("Stok_ID", sort=False)["Miktar_KG"].sum().items():
+        wb.add_to_cell("inventory", "Stok_ID", sid, "Kalan_Miktar", -kg)
+    return wb
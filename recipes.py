@@ -0,0 +1,100 @@
+import pandas as pd
+import numpy as np
+import json
+import ast
+from storage import load_many, data_version, memo, to_float
+
+# --- REÇETE MATRİSİ ---
+# Reçeteler veri versiyonu başına bir kez çözülür: ürün x hammadde yoğun matris (katı oran, sıvı kg/100).
+# Yeni kayıtlar gerçek JSON yazılır; eski Python-literal metinler okunurken yine çözülür.
+
+def parse_recipe(text):
+    """Reçete metni -> {hammadde: float}; önce JSON, olmazsa eski literal biçim"""
+    if isinstance(text, dict): d = text
+    else:
+        s = str(text or "").strip()
+        if not s: return {}
+        try: d = json.loads(s)
+        except ValueError:
+            try: d = ast.literal_eval(s)
+            except: return {}
+    return {str(k): to_float(v) for k, v in d.items()} if isinstance(d, dict) else {}
+
+def dump_recipe(d):
+    """{hammadde: oran} -> JSON metni (sıfırlar yazılmaz)"""
+    return json.dumps({k: float(v) for k, v in d.items() if v}, ensure_ascii=False)
+
+class RecipeBook:
+    """Ürün x hammadde reçete matrisi; teorik tüketim ve fire tek vektör işlemiyle hesaplanır"""
+    def __init__(self, prods, solid, liquid):
+        self.codes = [str(c) for c in prods["Urun_Kodu"]]
+        self.pos = {c: i for i, c in enumerate(self.codes)}
+        self.solid, self.liquid = list(solid), list(liquid)
+        self.raw_solid = [parse_recipe(x) for x in prods["Recete_Kati_JSON"]]
+        self.raw_liquid = [parse_recipe(x) for x in prods["Recete_Sivi_JSON"]]
+        self.S = np.array([[r.get(i, 0.0) for i in self.solid] for r in self.raw_solid], dtype=float).reshape(len(self.codes), len(self.solid))
+        self.L = np.array([[r.get(i, 0.0) for i in self.liquid] for r in self.raw_liquid], dtype=float).reshape(len(self.codes), len(self.liquid))
+        self._desc = None
+        self.net = pd.to_numeric(prods["Net_Paket_KG"], errors="coerce").fillna(0).to_numpy(dtype=float)
+
+    def recipe(self, code):
+        """Tek ürünün (katı, sıvı) sözlükleri"""
+        i = self.pos[str(code)]
+        return self.raw_solid[i], self.raw_liquid[i]
+
+    def describe(self):
+        """Listeleme için okunur reçete metinleri (kitap başına bir kez)"""
+        if self._desc is not None: return self._desc
+        kati = [", ".join(f"{k}: {v*100:.2f}%" for k, v in r.items() if v > 0) for r in self.raw_solid]
+        sivi = [", ".join(f"{k}: {v:.2f}kg/100" for k, v in r.items() if v > 0) for r in self.raw_liquid]
+        self._desc = (kati, sivi)
+        return self._desc
+
+    def _rows(self, codes):
+        return np.array([self.pos[str(c)] for c in codes], dtype=int)
+
+    def theoretical(self, codes, packages):
+        """Her üretim için teorik katı ve sıvı ihtiyacı (satır: üretim, sütun: hammadde)"""
+        idx = self._rows(codes)
+        nkg = np.asarray(packages, dtype=float) * self.net[idx]
+        solid = pd.DataFrame(nkg[:, None] * self.S[idx], columns=self.solid)
+        liquid = pd.DataFrame(nkg[:, None] / 100 * self.L[idx], columns=self.liquid)
+        return solid, liquid
+
+    def waste(self, codes, packages, act_solid, act_liquid):
+        """Fiili (üretim x hammadde) - teorik toplamları -> (katı fire, sıvı fire) dizileri"""
+        ts, tl = self.theoretical(codes, packages)
+        fs = np.asarray(act_solid, dtype=float).reshape(ts.shape).sum(axis=1) - ts.to_numpy().sum(axis=1)
+        fl = np.asarray(act_liquid, dtype=float).reshape(tl.shape).sum(axis=1) - tl.to_numpy().sum(axis=1)
+        return fs, fl
+
+    def requirements(self, packages_by_code):
+        """Birden çok ürün için toplam hammadde ihtiyacı"""
+        if not packages_by_code: return pd.Series(dtype=float)
+        codes, pk = zip(*packages_by_code.items())
+        ts, tl = self.theoretical(codes, pk)
+        return pd.concat([ts.sum(), tl.sum()]).groupby(level=0).sum()
+
+    def can_produce(self, packages_by_code, inv):
+        """Mevcut stokla istenen paketler üretilebilir mi? (hammadde bazında ihtiyaç / mevcut / eksik)"""
+        need = self.requirements({k: v for k, v in packages_by_code.items() if v > 0})
+        have = pd.to_numeric(inv["Kalan_Miktar"], errors="coerce").fillna(0).groupby(inv["Hammadde"]).sum() if not inv.empty else pd.Series(dtype=float)
+        out = pd.DataFrame({"Gerekli_KG": need, "Mevcut_KG": have.reindex(need.index).fillna(0)})
+        out["Eksik_KG"] = (out["Gerekli_KG"] - out["Mevcut_KG"]).clip(lower=0)
+        return out[out["Gerekli_KG"] > 0]
+
+    def max_packages(self, inv):
+        """Her ürün tek başına üretilse mevcut stokla en fazla kaç paket çıkar"""
+        have = pd.to_numeric(inv["Kalan_Miktar"], errors="coerce").fillna(0).groupby(inv["Hammadde"]).sum() if not inv.empty else pd.Series(dtype=float)
+        per_pkg = np.hstack([self.S, self.L / 100]) * self.net[:, None]
+        stock = have.reindex(self.solid + self.liquid).fillna(0).to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(per_pkg > 0, stock[None, :] / per_pkg, np.inf)
+        m = ratio.min(axis=1) if ratio.shape[1] else np.full(len(self.codes), np.inf)
+        return pd.Series(np.floor(np.where(np.isfinite(m), m, 0)).astype(int), index=self.codes)
+
+def get_recipe_book(solid, liquid):
+    """Ürünler ve hammadde listesi değişmedikçe aynı matris kullanılır"""
+    prods, = load_many("products")
+    ver = (data_version("products", "ingredients"), tuple(solid), tuple(liquid))
+    return memo("recipe_book", ver, lambda: RecipeBook(prods, solid, liquid))
@@ -0,0 +1,138 @@
+import pandas as pd
+import numpy as np
+import copy
+from storage import SCHEMA, load_many, data_version, memo, committed, to_float
+from archive import load_with_archive, archive_version
+from metrics import METRICS
+
+# --- ÖZETLER (FİRE VE STOK) ---
+# Fire: gün/hafta/ay x ürün toplamları. Üretim logu sadece sona eklendiği için yeni satırlar gelince sadece onlar
+# toplanıp eklenir; satır silinmiş/arşivlenmişse baştan (vektörel) kurulur. Yüzdeler okurken toplamlardan hesaplanır.
+# Stok: hammadde başına eldeki miktar ve kritik limit. Bu süreçte commit edilen stok girişi, düşümü ve silmesi
+# günlükten (storage.committed) toplamlara işlenir; sekme tekrar okununca satır sayısı ve genel toplam tutuyorsa
+# yeniden gruplanmaz. Tutmazsa (başka makineden yazma, elle düzenleme) veya günlükte boşluk varsa baştan kurulur.
+PERIODS = {"Gün": "D", "Hafta": "W", "Ay": "M"}
+SUM_COLS = ["Uretilen_Net_KG", "Uretilen_Paket", "Fire_Kati_KG", "Fire_Sivi_KG", "Fire_Amb_KG"]
+
+def _ratio(num, den, scale=100.0):
+    num, den = np.asarray(num, dtype="float64"), np.asarray(den, dtype="float64")
+    return np.divide(num * scale, den, out=np.zeros_like(num), where=den > 0)
+
+def add_waste_pct(df):
+    """Fire yüzdeleri (satır veya toplam): katı girişe, sıvı ve ambalaj net üretime göre; ambalaj gr/paket"""
+    df = df.copy()
+    df["Katı %"] = _ratio(df["Fire_Kati_KG"], df["Uretilen_Net_KG"] + df["Fire_Kati_KG"])
+    df["Sıvı %"] = _ratio(df["Fire_Sivi_KG"], df["Uretilen_Net_KG"])
+    df["Amb %"] = _ratio(df["Fire_Amb_KG"], df["Uretilen_Net_KG"])
+    df["Amb (gr/pkt)"] = _ratio(df["Fire_Amb_KG"], df["Uretilen_Paket"], 1000.0)
+    return df
+
+def aggregate(prod):
+    """Üretim satırları -> (Donem, Baslangic, Urun_Kodu) başına toplamlar ve kayıt sayısı"""
+    vals = prod[SUM_COLS].astype("float64").assign(Adet=1.0)
+    code = prod["Urun_Kodu"].astype(str).rename("Urun_Kodu")
+    parts = {}
+    for name, freq in PERIODS.items():
+        start = prod["Tarih"].dt.to_period(freq).dt.start_time.rename("Baslangic")
+        parts[name] = vals.groupby([start, code]).sum()  # tarihi boş satır dışarıda kalır
+    return pd.concat(parts, names=["Donem"])
+
+class WasteRollup:
+    def __init__(self, sums, since=None, n=0, last=None):
+        self.sums, self.since = sums, since
+        self.n, self.last = n, last  # toplanan satır sayısı ve son Uretim_ID (artımlı güncelleme için)
+
+    def table(self, period):
+        """Dönem toplamları ve fire yüzdeleri, en yeni dönem önce"""
+        if self.sums.empty or period not in self.sums.index.get_level_values(0): return pd.DataFrame()
+        t = add_waste_pct(self.sums.loc[period].reset_index())
+        return t.sort_values(["Baslangic", "Urun_Kodu"], ascending=[False, True], ignore_index=True)
+
+def get_waste_rollup(since=None):
+    """Fire özeti. since verilirse arşivdeki üretimler de dahil (ayrı tutulur, sıcak özet bozulmaz)"""
+    prod = load_with_archive("production", since)
+    ver = (data_version("production"), since, archive_version("production", since))
+    def build(prev):
+        n = prev.n if prev and prev.since == since else 0
+        # Önceki son satır aynı yerdeyse araya ekleme/silme olmamıştır: sadece yeni satırlar toplanır
+        if n and n <= len(prod) and prod["Uretim_ID"].iat[n - 1] == prev.last:
+            new = prod.iloc[n:]
+            sums = prev.sums.add(aggregate(new), fill_value=0).sort_index() if len(new) else prev.sums
+            METRICS.count("rollup_updates_total", rollup="fire", kind="incremental")
+        else:
+            sums = aggregate(prod)
+            METRICS.count("rollup_updates_total", rollup="fire", kind="full")
+        return WasteRollup(sums, since, len(prod), prod["Uretim_ID"].iat[-1] if len(prod) else None)
+    return memo(("waste_rollup", since is None), ver, build, prev=True)
+
+STOCK_COLS = list(SCHEMA["stok_durumu"])
+
+class StockRollup:
+    """Hammadde -> eldeki miktar. Artımlı güncelleme için satırlar (Stok_ID -> Hammadde, Kalan): kuruluştaki stok
+    tablosu (değişmez) + sonradan değişen/eklenen satırlar (silinen: None)"""
+    def __init__(self, inv, version):
+        self.version, self.n = version, len(inv)
+        self.base = inv[["Hammadde", "Kalan_Miktar"]].set_index(inv["Stok_ID"])
+        self.over = {}
+        on_hand = inv.groupby("Hammadde", observed=True)["Kalan_Miktar"].sum().astype("float64")
+        self.on_hand = dict(zip(on_hand.index.astype(str), on_hand.to_numpy()))
+        self.total = float(inv["Kalan_Miktar"].astype("float64").sum())
+
+    def row(self, sid):
+        if sid in self.over: return self.over[sid]
+        try: i = self.base.index.get_loc(sid)
+        except KeyError: return None
+        if not isinstance(i, (int, np.integer)): return None  # Stok_ID tekrar ediyor
+        return str(self.base["Hammadde"].iat[i]), float(self.base["Kalan_Miktar"].iat[i])
+
+    def _add(self, ham, kg):
+        self.on_hand[ham] = self.on_hand.get(ham, 0.0) + kg; self.total += kg
+
+    def apply(self, batches, version):
+        """Commit edilen batch'leri işle -> yeni özet (eskisi değişmez); işlenemeyen değişiklik varsa None"""
+        new = copy.copy(self)
+        new.version, new.over, new.on_hand = version, dict(self.over), dict(self.on_hand)
+        si, hi, ki = (STOCK_COLS.index(c) for c in ("Stok_ID", "Hammadde", "Kalan_Miktar"))
+        for b in batches:
+            for r in b.appends.get("stok_durumu", []):
+                if len(r) <= max(si, hi): return None
+                kg = to_float(r[ki]) if ki < len(r) else 0.0
+                new.over[str(r[si])] = (str(r[hi]), kg); new._add(str(r[hi]), kg); new.n += 1
+            for (t, ucol, uval, tcol, val, is_delta) in b.updates:
+                if t != "stok_durumu" or tcol not in ("Hammadde", "Kalan_Miktar"): continue
+                got = new.row(uval) if ucol == "Stok_ID" and is_delta and tcol == "Kalan_Miktar" else None
+                if got is None: return None  # elle düzeltme (değer atama) veya bulunamayan satır
+                new.over[uval] = (got[0], got[1] + val); new._add(got[0], val)
+            for (t, ucol, uval) in b.deletes:
+                if t != "stok_durumu": continue
+                got = new.row(uval) if ucol == "Stok_ID" else None
+                if got is None: return None
+                new.over[uval] = None; new._add(got[0], -got[1]); new.n -= 1
+        return new
+
+    def matches(self, inv):
+        """Okunan sekmeyle satır sayısı ve genel toplam tutuyor mu (float32 yuvarlaması kadar pay)"""
+        total = float(inv["Kalan_Miktar"].astype("float64").sum())
+        return len(inv) == self.n and abs(total - self.total) <= 1e-6 * abs(total) + 1e-2
+
+def get_stock_rollup():
+    """Hammadde -> Eldeki_KG, Kritik_Limit_KG, Dusuk (eldeki < limit); stok/limit değişmedikçe aynı tablo"""
+    inv, lim = load_many("inventory", "limits")
+    ver = data_version("inventory", "limits")
+    inv_ver = ver[0][0] if ver[0] else None
+    def build(prev):
+        got = None
+        if prev and inv_ver is not None and prev.version is not None and prev.version <= inv_ver:
+            batches = committed("stok_durumu", prev.version, inv_ver)
+            got = prev.apply(batches, inv_ver) if batches is not None else None
+            if got and not got.matches(inv): got = None
+        METRICS.count("rollup_updates_total", rollup="stok", kind="incremental" if got else "full")
+        got = got or StockRollup(inv, inv_ver)
+        limit = lim.drop_duplicates("Hammadde").set_index(lim["Hammadde"].drop_duplicates().astype(str))["Kritik_Limit_KG"]
+        t = pd.DataFrame({"Eldeki_KG": pd.Series(got.on_hand, dtype="float64"), "Kritik_Limit_KG": limit.astype("float64")})
+        t = t.fillna(0.0).sort_index()
+        t["Dusuk"] = t["Eldeki_KG"] < t["Kritik_Limit_KG"]
+        t.index.name = "Hammadde"
+        got.table = t
+        return got
+    return memo("stock_rollup", ver, build, prev=True).table
@@ -0,0 +1,60 @@
+import os
+import json
+import hashlib
+import threading
+import pandas as pd
+
+try:
+    import pyarrow as pa  # pa.ipc paketle birlikte yüklenir
+except ImportError:
+    pa = None
+
+# --- YEREL ANLIK GÖRÜNTÜ (ARROW IPC) ---
+# Her sekmenin son okunan hali diskte tek bir Arrow dosyasında durur (veri + damga aynı dosyada, yazma atomik).
+# Yeni süreç açılınca sekmeler buradan bellek eşlemeli okunur, sayfa hemen çizilir; depo arka planda kontrol edilir.
+# Aynı makinedeki tüm süreçler aynı klasörü paylaşır. pyarrow yoksa kapalıdır.
+
+def frame_digest(df):
+    """İçerik özeti: yeniden okunan sekme değişmemişse eski df (ve türetilmiş yapılar) korunur"""
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+class SnapshotStore:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    @classmethod
+    def open(cls, path):
+        if pa is None: return None
+        try: return cls(path)
+        except OSError: return None
+
+    def file(self, tab_name):
+        return os.path.join(self.path, f"{tab_name}.arrow")
+
+    def load(self, tab_name, schema):
+        """-> (df, damga) veya None. Şema değiştiyse dosya yok sayılır"""
+        try:
+            reader = pa.ipc.open_file(pa.memory_map(self.file(tab_name), "r"))
+            meta = json.loads(reader.schema.metadata[b"snapshot"])
+            if meta.get("schema") != [list(x) for x in schema.items()]: return None
+            return reader.read_all().to_pandas(), meta
+        except Exception:
+            return None
+
+    def save(self, tab_name, df, meta, schema):
+        """Geçici dosyaya yaz, sonra yerine taşı: okuyan süreç yarım dosya görmez"""
+        meta = dict(meta, schema=[list(x) for x in schema.items()])
+        if not meta.get("digest"): meta["digest"] = frame_digest(df)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"snapshot": json.dumps(meta, default=str).encode()})
+        tmp = f"{self.file(tab_name)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self.lock:
+            try:
+                with pa.OSFile(tmp, "wb") as f:
+                    with pa.ipc.new_file(f, table.schema) as w: w.write_table(table)
+                os.replace(tmp, self.file(tab_name))
+            finally:
+                if os.path.exists(tmp): os.remove(tmp)
+        return meta["digest"]
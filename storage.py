@@ -0,0 +1,1028 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from pandas.api.types import union_categoricals
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+from gspread.utils import rowcol_to_a1
+from datetime import datetime, date
+import os
+import re
+import sqlite3
+import threading
+import time
+import json
+import bisect
+import uuid
+from collections import OrderedDict
+try: import fcntl
+except ImportError: fcntl = None  # Windows: kilit sadece süreç içi
+from contextlib import contextmanager
+from metrics import METRICS, Instrumented
+from snapshot import SnapshotStore, frame_digest
+
+# --- GOOGLE BAĞLANTISI ---
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+SHEET_NAME = "Uretim_Takip_Sistemi"
+
+def get_setting(name, default=None):
+    """Ayar oku: önce ortam değişkeni (BÜYÜK HARF), sonra st.secrets"""
+    v = os.environ.get(name.upper())
+    if v: return v
+    try: return st.secrets.get(name, default)
+    except: return default
+
+@st.cache_resource
+def get_gsheet_client():
+    # Test / benchmark: bellekteki sahte gspread (fake_gspread.py)
+    if str(get_setting("fake_gspread", "0")) == "1":
+        import fake_gspread
+        return fake_gspread.shared_client(float(get_setting("fake_gspread_latency_ms", 0)), int(get_setting("fake_gspread_quota_per_min", 0)))
+    try:
+        if "gcp_service_account" in st.secrets:
+            creds_dict = dict(st.secrets["gcp_service_account"])
+            creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPE)
+        else:
+            creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", SCOPE)
+        return gspread.authorize(creds)
+    except Exception as e:
+        return None
+
+# --- TABLO ŞEMASI ---
+# Sütun tipleri: id (anahtar/parti no, metin), category (tekrar eden adlar), float32 (miktarlar),
+# date (datetime64), text (serbest metin/JSON). Okuma tek geçişte bu tiplere çevirir.
+SCHEMA = {
+    "bilesenler": {"Bilesen_Adi": "category", "Tip": "category"},
+    "limitler": {"Hammadde": "category", "Kritik_Limit_KG": "float32"},
+    "urun_tanimlari": {"Urun_Kodu": "category", "Urun_Adi": "text", "Net_Paket_KG": "float32", "Raf_Omru_Ay": "float32",
+                       "Recete_Kati_JSON": "text", "Recete_Sivi_JSON": "text"},
+    "stok_durumu": {"Stok_ID": "id", "Tarih": "date", "Hammadde": "category", "Parti_No": "id", "Giris_Miktari": "float32",
+                    "Kalan_Miktar": "float32", "Birim": "category", "Ambalaj_Birim_Gr": "float32", "Versiyon": "float32"},
+    "uretim_loglari": {"Uretim_ID": "id", "Tarih": "date", "Urun_Kodu": "category", "Uretim_Parti_No": "id",
+                       "Uretilen_Paket": "float32", "Uretilen_Net_KG": "float32", "Fire_Kati_KG": "float32",
+                       "Fire_Sivi_KG": "float32", "Fire_Amb_KG": "float32", "Detaylar": "text"},
+    "bitmis_urunler": {"Uretim_ID": "id", "Urun_Kodu": "category", "Uretim_Parti_No": "id", "Uretim_Tarihi": "date", "SKT": "date",
+                       "Baslangic_Net_KG": "float32", "Kalan_Net_KG": "float32", "Paket_Agirligi": "float32", "Versiyon": "float32"},
+    "sevkiyatlar": {"Sevkiyat_ID": "id", "Tarih": "date", "Uretim_ID": "id", "Musteri": "category", "Tip": "category",
+                    "Sevk_Edilen_KG": "float32", "Aciklama": "text"},
+    "silme_loglari": {"Log_ID": "id", "Tarih": "date", "Tur": "category", "Detay": "text", "Neden": "text"},
+    "olay_loglari": {"Olay_ID": "id", "Tarih": "date", "Tablo": "category", "Islem": "category", "Anahtar_Sutun": "category",
+                     "Anahtar": "id", "Veri": "text", "Neden": "text"},
+    "tuketim_loglari": {"Uretim_ID": "id", "Hammadde": "category", "Parti_No": "id", "Miktar_KG": "float32"},
+    "arsiv_manifest": {"Arsiv_Sekme": "id", "Tablo": "category", "Ilk_Tarih": "date", "Son_Tarih": "date", "Satir": "float32",
+                       "Guncelleme": "date"}
+}
+
+TABS = {
+    "production": "uretim_loglari", "inventory": "stok_durumu",
+    "products": "urun_tanimlari", "finished_goods": "bitmis_urunler",
+    "shipments": "sevkiyatlar", "limits": "limitler", "ingredients": "bilesenler",
+    "deletion_logs": "silme_loglari", "events": "olay_loglari", "consumption": "tuketim_loglari",
+    "archive_manifest": "arsiv_manifest"
+}
+
+def base_tab(tab_name):
+    """Arşiv bölümü ("uretim_loglari_2023") -> ana sekme; şema ve tipler ana sekmeden gelir"""
+    m = re.match(r"^(.+)_(\d{4})$", tab_name)
+    return m.group(1) if m and m.group(1) in SCHEMA else tab_name
+
+# Sayı olması gerekenler
+NUMERIC_COLS = {c for cols in SCHEMA.values() for c, kind in cols.items() if kind == "float32"}
+
+# Bakiye satırlarının sürüm sayacı: her güncellemede +1 (eşzamanlı yazma kontrolü)
+VERSION_COL = "Versiyon"
+# Sadece Sheets'te: satıra son yazanların jetonları (virgüllü, en yenisi sonda). Şemada yok, tablolara yüklenmez
+TRAIL_COL, TRAIL_LEN = "Yazim_Izi", 10
+CAS_RETRIES = 5
+
+class ConflictError(Exception):
+    pass
+
+# Parti, ürün ve ID sütunları (SQLite indeksleri)
+INDEXED_COLS = ["Stok_ID", "Uretim_ID", "Sevkiyat_ID", "Log_ID", "Olay_ID", "Parti_No", "Uretim_Parti_No",
+                "Urun_Kodu", "Hammadde", "Bilesen_Adi"]
+
+def clean_row(row_data):
+    out = []
+    for item in row_data:
+        if item is None or item is pd.NaT: out.append("")
+        elif isinstance(item, datetime) and item.time() != datetime.min.time(): out.append(item.strftime("%Y-%m-%d %H:%M:%S"))
+        elif isinstance(item, (datetime, date)): out.append(item.strftime("%Y-%m-%d"))
+        elif isinstance(item, np.float32): out.append(float(str(item)))  # 0.3, 0.30000001192... değil
+        elif hasattr(item, "item"): out.append(item.item())  # numpy sayıları JSON'a uygun olsun
+        else: out.append(item)
+    return out
+
+def to_float(v):
+    try: return float(str(v).replace(",", "."))
+    except: return 0.0
+
+# --- TOPLU YAZMA (TEK SEFERDE) ---
+class WriteBatch:
+    """Satır eklemeleri ve hücre güncellemelerini toplayıp seçili depoya tek seferde gönderir"""
+    def __init__(self):
+        self.appends = {}  # sekme -> [satır, ...]
+        self.updates = []  # (sekme, anahtar_sütun, anahtar_değer, hedef_sütun, değer, artış_mı)
+        self.deletes = []  # (sekme, anahtar_sütun, anahtar_değer)
+        self.landed = {}   # güncellemenin sırası -> satıra yazdığımız jeton (Sheets; tekrar denemede kontrol edilir)
+
+    def add_row(self, row_data, key):
+        # key: TABS anahtarı ya da doğrudan sekme adı (arşiv bölümleri)
+        self.appends.setdefault(TABS.get(key, key), []).append(clean_row(row_data))
+
+    def update_cell(self, key, unique_col_name, unique_val, target_col_name, new_val):
+        self.updates.append((TABS[key], unique_col_name, str(unique_val), target_col_name, new_val, False))
+
+    def add_to_cell(self, key, unique_col_name, unique_val, target_col_name, delta):
+        """Hücreye okunan güncel değer üzerinden ekle/çıkar (stok düşümü vb.)"""
+        self.updates.append((TABS[key], unique_col_name, str(unique_val), target_col_name, delta, True))
+
+    def update_row(self, key, unique_col_name, unique_val, values):
+        for c, v in values.items():
+            if c != unique_col_name: self.update_cell(key, unique_col_name, unique_val, c, v)
+
+    def delete_row(self, key, unique_col_name, unique_val):
+        self.deletes.append((TABS[key], unique_col_name, str(unique_val)))
+
+    def copy(self):
+        wb = WriteBatch()
+        wb.appends = {t: list(rows) for t, rows in self.appends.items()}
+        wb.updates, wb.deletes, wb.landed = list(self.updates), list(self.deletes), dict(self.landed)
+        return wb
+
+    def tabs(self):
+        return set(self.appends) | {u[0] for u in self.updates} | {d[0] for d in self.deletes}
+
+    def empty(self):
+        return not (self.appends or self.updates or self.deletes)
+
+    def merge(self, other):
+        """Başka bir batch'in işlemlerini sona ekle (kuyrukta birleştirme)"""
+        for t, rows in other.appends.items(): self.appends.setdefault(t, []).extend(rows)
+        self.landed.update({len(self.updates) + i: tok for i, tok in other.landed.items()})
+        self.updates += other.updates; self.deletes += other.deletes
+
+    def keep_updates(self, keep):
+        """Sadece verilen sıralardaki güncellemeler kalsın; jetonlar yeni sıraya taşınır"""
+        pos = {i: n for n, i in enumerate(keep)}
+        self.updates = [self.updates[i] for i in keep]
+        self.landed = {pos[i]: tok for i, tok in self.landed.items() if i in pos}
+
+    def to_json(self):
+        ups = [list(u[:4]) + [clean_row([u[4]])[0], u[5]] for u in self.updates]
+        return json.dumps({"appends": self.appends, "updates": ups, "deletes": self.deletes,
+                           "landed": sorted(self.landed.items())}, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text):
+        d = json.loads(text); wb = cls()
+        wb.appends = d.get("appends", {})
+        wb.updates = [tuple(u) for u in d.get("updates", [])]
+        wb.deletes = [tuple(x) for x in d.get("deletes", [])]
+        wb.landed = {int(i): tok for i, tok in d.get("landed", [])}
+        return wb
+
+    def flush(self):
+        if self.empty(): return
+        # Uygulama içinde yazmalar kalıcı kuyruğa gider, arka plan işçisi gönderir
+        from write_queue import queue_enabled, get_write_queue
+        METRICS.count("writes_total", tabs=",".join(sorted(self.tabs())))
+        if queue_enabled(): get_write_queue().put(self); return
+        tabs, done = self.tabs(), self.copy()
+        backend = get_backend()
+        try:
+            with METRICS.timer("storage_seconds", op="commit", backend=backend.name): backend.commit(self)
+        except BaseException:
+            invalidate(*tabs); raise  # yarım kalsa bile sadece dokunulan sekmeler tazelensin
+        invalidate(*tabs, batch=done)
+
+# --- DEPOLAMA ARAYÜZÜ ---
+class StorageBackend:
+    """Tüm okuma/yazma bu arayüzden geçer. Sekmeler SCHEMA/TABS ile aynı"""
+    name = ""
+    def read_values(self, tab_name, start_row=1):
+        """Başlık satırı + veri satırları (liste listesi). start_row>1 ise o satırdan itibaren (başlıksız)"""
+        raise NotImplementedError
+    def read_many(self, requests):
+        """[(sekme, start_row), ...] -> her biri için read_values sonucu"""
+        return [self.read_values(t, start_row=r) for t, r in requests]
+    def commit(self, batch):
+        """WriteBatch içeriğini uygula. Tamamlanan kısımlar batch'ten düşülür ki tekrar denemede yinelenmesin"""
+        raise NotImplementedError
+    def rewrite(self, tab_name, values):
+        """Sekmeyi başlık + satırlarla baştan yaz"""
+        raise NotImplementedError
+    def delete_where(self, tab_name, col, values):
+        """col değeri verilen kümede olan tüm satırları sil (arşivleme); silinen satır sayısı"""
+        raise NotImplementedError
+    def revision(self):
+        """Deponun son değişiklik damgası (bilinmiyorsa None): aynıysa cache'teki sekmeler okunmadan taze sayılır"""
+        return None
+    # commit_lock: commit'ler paylaşımlı tutar, birbirini beklemez. Satır numarası kaydıran/sekmeyi toptan değiştiren
+    # işler (satır silen commit, delete_where, rewrite, arşivleme) özel tutar ve araya yazma almaz
+
+# --- YAZMA KİLİDİ ---
+class HostLock:
+    """Aynı makinedeki süreç ve iş parçacıkları için okur/yazar kilidi. with kilit: özel, with kilit.shared(): paylaşımlı.
+    Her alışta kilit dosyası ayrı açılır (flock açık dosyaya bağlı, süreç ölünce bırakılır). Aynı iş parçacığı iç içe
+    alabilir ama paylaşımlıdan özele geçemez"""
+    def __init__(self, path):
+        self.path, self.local = path, threading.local()
+        self.fallback = None if fcntl else threading.RLock()  # Windows: süreç içi, paylaşımsız
+
+    def _acquire(self, exclusive):
+        held = getattr(self.local, "held", None)  # [kip, derinlik, dosya]
+        if held:
+            if exclusive and held[0] == "sh": raise RuntimeError("Paylaşımlı yazma kilidi özel kilide yükseltilemez")
+            held[1] += 1; return
+        f = None
+        if self.fallback: self.fallback.acquire()
+        else:
+            f = open(self.path, "a")
+            try: fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            except BaseException: f.close(); raise
+        self.local.held = ["ex" if exclusive else "sh", 1, f]
+
+    def _release(self):
+        held = self.local.held
+        held[1] -= 1
+        if held[1]: return
+        self.local.held = None
+        if held[2]: held[2].close()  # dosya kapanınca flock bırakılır
+        else: self.fallback.release()
+
+    def __enter__(self):
+        self._acquire(True); return self
+
+    def __exit__(self, *exc):
+        self._release()
+
+    @contextmanager
+    def shared(self):
+        self._acquire(False)
+        try: yield self
+        finally: self._release()
+
+# --- GOOGLE SHEETS MOTORU ---
+# Güncellemelerde tüm sekmeyi indirmek yerine satırı indeksten bul
+INDEX_KEYS = {
+    "bilesenler": ["Bilesen_Adi"],
+    "limitler": ["Hammadde"],
+    "urun_tanimlari": ["Urun_Kodu"],
+    "stok_durumu": ["Stok_ID", "Parti_No"],
+    "uretim_loglari": ["Uretim_ID", "Uretim_Parti_No"],
+    "bitmis_urunler": ["Uretim_ID", "Uretim_Parti_No"]
+}
+READ_PARAMS = {"valueRenderOption": "UNFORMATTED_VALUE", "dateTimeRenderOption": "FORMATTED_STRING"}
+
+def col_letter(col_idx): return re.sub(r"\d", "", rowcol_to_a1(1, col_idx))
+
+class SheetsBackend(StorageBackend):
+    """Sheets'te koşullu yazma yok. Bakiye satırları jeton izi + geri okumayla korunur: yazdıktan sonra okunan satırın
+    izinde jetonumuz yoksa bizi görmeden yazan biri ezmiştir, artışlar güncel değere tekrar uygulanır; varsa yazım
+    yerindedir (üstüne bizi görerek yazılmış olabilir). Sınır: bizden önce okuyup bizim geri okumamızdan SONRA varan
+    yazım fark edilmez. Aynı makinede yazmalar kuyruktan tek tek gittiği için bu pencere sadece başka makineden (veya
+    kuyruksuz, doğrudan commit ile) aynı satıra aynı anda yazılınca açılır"""
+    name = "sheets"
+
+    def __init__(self):
+        self.indexes = {}  # sekme -> {"header": [...], "keys": {sütun: {değer: satır}}, "n": son_satır}
+        self.lock = threading.Lock()
+        self.commit_lock = HostLock(get_setting("write_lock_path", "uretim_yazma.lock"))
+        self.sh = None; self.handles = {}  # Spreadsheet ve sekme nesneleri bir kez açılır
+
+    # --- BAĞLANTI NESNELERİ ---
+    def spreadsheet(self):
+        if self.sh is None:
+            client = get_gsheet_client()
+            if not client: return None
+            self.sh = Instrumented(Instrumented(client).open(SHEET_NAME))  # her API çağrısı sayılır
+            self.handles = {ws.title: ws for ws in self.sh.worksheets()}
+        return self.sh
+
+    def worksheet(self, tab_name):
+        sh = self.spreadsheet()
+        if not sh: return None
+        ws = self.handles.get(tab_name)
+        if ws is None:
+            ws = self.handles[tab_name] = sh.add_worksheet(title=tab_name, rows="1000", cols="20")
+            # Yeni sekme: başlık satırı olmadan ilk kayıt başlık sanılır
+            if base_tab(tab_name) in SCHEMA: ws.append_row(list(SCHEMA[base_tab(tab_name)]), value_input_option="RAW")
+        return ws
+
+    def reset_handles(self):
+        self.sh = None; self.handles = {}
+
+    def revision(self):
+        # Drive'daki değişiklik zamanı: Sheets okuma kotasından düşmez, tek küçük istek
+        try: return self.spreadsheet().get_lastUpdateTime()
+        except Exception: return None
+
+    # --- SATIR İNDEKSİ (ANAHTAR -> SATIR NO) ---
+    def build_row_index(self, sh, tab_name):
+        """Başlık + sadece anahtar sütunlarını okuyarak indeksi kur"""
+        head = sh.values_get(f"'{tab_name}'!1:1").get("values", [])
+        header = [str(h) for h in head[0]] if head else []
+        cols = [c for c in INDEX_KEYS[tab_name] if c in header]
+        ix = {"header": header, "keys": {c: {} for c in cols}, "n": 1}
+        if cols:
+            ranges = [f"'{tab_name}'!{col_letter(header.index(c) + 1)}2:{col_letter(header.index(c) + 1)}" for c in cols]
+            res = sh.values_batch_get(ranges, params=READ_PARAMS)
+            for c, vr in zip(cols, res.get("valueRanges", [])):
+                vals = vr.get("values", [])
+                ix["n"] = max(ix["n"], len(vals) + 1)
+                for i, v in enumerate(vals):
+                    if v and str(v[0]) != "": ix["keys"][c].setdefault(str(v[0]), i + 2)
+        with self.lock: self.indexes[tab_name] = ix
+        return ix
+
+    def get_row_index(self, sh, tab_name, rebuild=False):
+        ix = self.indexes.get(tab_name)
+        if ix is None or rebuild: ix = self.build_row_index(sh, tab_name)
+        return ix
+
+    def note_appended(self, tab_name, res, rows):
+        """append cevabındaki aralıktan yeni satır numaralarını indekse işle"""
+        ix = self.indexes.get(tab_name)
+        if ix is None: return
+        try: start = int(re.search(r"!\$?[A-Z]+\$?(\d+)", res["updates"]["updatedRange"]).group(1))
+        except: self.drop_row_index(tab_name); return
+        with self.lock:
+            for i, row in enumerate(rows):
+                for c, m in ix["keys"].items():
+                    ci = ix["header"].index(c)
+                    if ci < len(row) and str(row[ci]) != "": m.setdefault(str(row[ci]), start + i)
+            ix["n"] = max(ix["n"], start + len(rows) - 1)
+
+    def note_deleted(self, tab_name, rows):
+        """Silinen satırları indeksten çıkar, alttakileri yukarı kaydır"""
+        ix = self.indexes.get(tab_name)
+        if ix is None: return
+        rows = sorted(rows)
+        with self.lock:
+            for c, m in ix["keys"].items():
+                for k in [k for k, r in m.items() if r in rows]: del m[k]
+                for k, r in m.items(): m[k] = r - bisect.bisect_left(rows, r)
+            ix["n"] -= len(rows)
+
+    def drop_row_index(self, tab_name):
+        with self.lock: self.indexes.pop(tab_name, None)
+
+    # --- OKUMA / YAZMA ---
+    def read_values(self, tab_name, start_row=1):
+        return self.read_many([(tab_name, start_row)])[0]
+
+    def read_many(self, requests):
+        # Tüm sekmeler tek values_batch_get isteğiyle
+        for attempt in range(2):
+            try:
+                if not self.spreadsheet(): return [[] for _ in requests]
+                for t, _ in requests: self.worksheet(t)
+                ranges = [f"'{t}'" if r <= 1 else f"'{t}'!A{r}:ZZ" for t, r in requests]
+                res = self.sh.values_batch_get(ranges, params=READ_PARAMS)
+                return [vr.get("values", []) for vr in res.get("valueRanges", [])]
+            except gspread.exceptions.APIError:
+                if attempt: raise
+                self.reset_handles()  # sekme elle silinmiş/yeniden adlandırılmış olabilir
+
+    def _targets(self, sh, updates):
+        """Hedef satırları oku. İndeksli sekmelerde sadece ilgili satırlar gelir;
+        anahtar tutmazsa (elle düzenleme) indeks yeniden kurulup tekrar denenir"""
+        tabs = sorted({u[0] for u in updates})
+        need = {t: {(u[1], u[2]) for u in updates if u[0] == t} for t in tabs}
+        out, stale = {}, set()
+
+        def fetch(tab_list, rebuilt):
+            ranges, plan = [], []
+            for t in tab_list:
+                if t not in INDEX_KEYS:
+                    ranges.append(f"'{t}'"); plan.append((t, None)); continue
+                ix = self.get_row_index(sh, t, rebuild=rebuilt)
+                ranges.append(f"'{t}'!1:1"); plan.append((t, "header"))
+                for ucol, uval in need[t]:
+                    r = ix["keys"].get(ucol, {}).get(uval)
+                    if r: ranges.append(f"'{t}'!{r}:{r}"); plan.append((t, (ucol, uval, r)))
+                    elif ucol in ix["keys"] and not rebuilt: stale.add(t)
+            if not ranges: return
+            res = sh.values_batch_get(ranges, params=READ_PARAMS)
+            for (t, item), vr in zip(plan, res.get("valueRanges", [])):
+                vals = vr.get("values", [])
+                if item is None:  # indekssiz sekme: tamamını tara
+                    header = [str(h) for h in vals[0]] if vals else []
+                    find = {}
+                    for ucol, uval in need[t]:
+                        if ucol not in header: continue
+                        ci = header.index(ucol)
+                        for i, r in enumerate(vals[1:]):
+                            if ci < len(r) and str(r[ci]) == uval: find[(ucol, uval)] = i + 2; break
+                    out[t] = (header, {i + 1: r for i, r in enumerate(vals)}, find)
+                    continue
+                ix = self.indexes.get(t, {"header": []})
+                if item == "header":
+                    if not vals or [str(h) for h in vals[0]] != ix["header"]: stale.add(t)
+                    out.setdefault(t, (ix["header"], {}, {})); continue
+                ucol, uval, r = item
+                row = vals[0] if vals else []
+                ci = ix["header"].index(ucol)
+                if ci < len(row) and str(row[ci]) == uval:
+                    out[t][1][r] = row; out[t][2][(ucol, uval)] = r
+                elif not rebuilt: stale.add(t)
+
+        fetch(tabs, False)
+        if stale:
+            retry = sorted(stale)
+            for t in retry: out.pop(t, None)
+            fetch(retry, True)
+        return out
+
+    def commit(self, batch):
+        # Satır silen batch numaraları kaydırır: tek başına çalışır, diğerleri paylaşımlı
+        with (self.commit_lock if batch.deletes else self.commit_lock.shared()): self._commit(batch)
+
+    def _commit(self, batch):
+        sh = self.spreadsheet()
+        if not sh: raise ConnectionError("Google Sheets bağlantısı yok")
+        # Önce eklemeler (olay logu ilk sırada): yarıda kesilirse olay kayıtlı kalır, sıkıştırma tamamlar
+        for t in sorted(batch.appends, key=lambda t: t != TABS["events"]):
+            rows = batch.appends[t]
+            self.worksheet(t)  # sekme yoksa oluştur
+            res = sh.values_append(f"'{t}'", {"valueInputOption": "USER_ENTERED"}, {"values": rows})
+            self.note_appended(t, res, rows)
+            del batch.appends[t]
+        lookups = batch.updates + batch.deletes
+        targets = self._targets(sh, lookups) if lookups else {}
+        # Güncellemeler: artışlar taze okunan değere eklenir. Her turda satırlar (tekrar) okunur, jetonu izde görünen
+        # güncellemeler düşer, kalanlar yazılır. Jetonlar yazmadan önce batch'e işlenir: yazım gidip cevabı ya da geri
+        # okuması kesilirse kuyruğun tekrar denemesi önce izi kontrol eder, artışı ikinci kez uygulamaz
+        ut = targets
+        for attempt in range(CAS_RETRIES + 1):
+            if attempt: ut = self._targets(sh, batch.updates)
+            batch.keep_updates([i for i, u in enumerate(batch.updates) if not self._landed(u, batch.landed.get(i), ut)])
+            if not batch.updates or attempt == CAS_RETRIES: break
+            data, batch.landed, done = self._plan_updates(batch.updates, ut)
+            if data: sh.values_batch_update({"valueInputOption": "USER_ENTERED", "data": data})
+            batch.keep_updates([i for i in range(len(batch.updates)) if i not in done])
+        if batch.updates: raise ConflictError(f"{len(batch.updates)} güncelleme {CAS_RETRIES} denemede yazılamadı (eşzamanlı yazma)")
+        # Satır silme: tek batch_update, alttan yukarı ki numaralar kaymasın
+        gone, requests = {}, []
+        for (t, ucol, uval) in batch.deletes:
+            r = targets.get(t, ({}, {}, {}))[2].get((ucol, uval))
+            if r and r not in gone.setdefault(t, set()): gone[t].add(r)
+        for t, rows in gone.items():
+            for r in sorted(rows, reverse=True):
+                requests.append({"deleteDimension": {"range": {"sheetId": self.worksheet(t).id, "dimension": "ROWS", "startIndex": r - 1, "endIndex": r}}})
+        if requests:
+            sh.batch_update({"requests": requests})
+            for t, rows in gone.items(): self.note_deleted(t, rows)
+        batch.deletes = []
+
+    def _plan_updates(self, updates, targets):
+        """Güncellemeleri hücre yazmalarına çevir -> (data, {sıra: jeton}, bitenler). Versiyon'lu satırda Versiyon +1 olur,
+        jeton ize eklenir ve satırın bütün sayı sütunları birlikte yazılır: bizi görmeden yazan biri ya hepsini ezer ya
+        hiçbirini. Bitenler: kontrol gerekmeyenler (Versiyon'suz sekme) ve uygulanacak satırı/sütunu olmayanlar"""
+        data, tokens, done = [], {}, set()
+        for t, (header, rows, find) in targets.items():
+            mine = [(i, u) for i, u in enumerate(updates) if u[0] == t]
+            if not mine: continue
+            header = list(header)
+            versioned = VERSION_COL in SCHEMA.get(t, [])
+            if versioned:
+                for c in (VERSION_COL, TRAIL_COL):
+                    if c not in header:  # eski sekme: sütunu başlığa ekle
+                        header.append(c)
+                        data.append({"range": f"'{t}'!{rowcol_to_a1(1, len(header))}", "values": [[c]]})
+                        self.drop_row_index(t)
+            cur, row_tok = {}, {}
+            for i, (tab, ucol, uval, tcol, val, is_delta) in mine:
+                row_idx = find.get((ucol, uval))
+                if not row_idx or tcol not in header: done.add(i); continue
+                col_idx = header.index(tcol) + 1
+                if is_delta:
+                    if (row_idx, col_idx) not in cur:
+                        r = rows[row_idx]
+                        cur[(row_idx, col_idx)] = to_float(r[col_idx - 1]) if col_idx <= len(r) else 0.0
+                    val = cur[(row_idx, col_idx)] + val
+                cur[(row_idx, col_idx)] = val
+                if versioned: tokens[i] = row_tok.setdefault(row_idx, "w" + uuid.uuid4().hex[:8])  # harfle başlar: sayı sanılmaz
+                else: done.add(i)
+            if row_tok:
+                nums = [header.index(c) + 1 for c, kind in SCHEMA[t].items() if kind == "float32" and c in header]
+                vi, ti = header.index(VERSION_COL) + 1, header.index(TRAIL_COL) + 1
+                for row_idx, tok in row_tok.items():
+                    r = rows[row_idx]
+                    for ci in nums: cur.setdefault((row_idx, ci), r[ci - 1] if ci <= len(r) else "")
+                    cur[(row_idx, vi)] = int(to_float(r[vi - 1]) if vi <= len(r) else 0) + 1
+                    trail = [x for x in str(r[ti - 1]).split(",") if x] if ti <= len(r) else []
+                    cur[(row_idx, ti)] = ",".join((trail + [tok])[-TRAIL_LEN:])
+            for (row_idx, col_idx), val in cur.items():
+                data.append({"range": f"'{t}'!{rowcol_to_a1(row_idx, col_idx)}", "values": [clean_row([val])]})
+        return data, tokens, done
+
+    def _landed(self, u, tok, targets):
+        """Güncellemenin satırına daha önce yazdığımız jeton, satırın izinde duruyor mu"""
+        if not tok: return False
+        header, rows, find = targets.get(u[0], ([], {}, {}))
+        r = find.get((u[1], u[2]))
+        if not r: return True  # satır o arada silinmiş: uygulanacak yer yok
+        row, ti = rows[r], header.index(TRAIL_COL) if TRAIL_COL in header else -1
+        return 0 <= ti < len(row) and tok in str(row[ti]).split(",")
+
+    def rewrite(self, tab_name, values):
+        with self.commit_lock:
+            ws = self.worksheet(tab_name)
+            ws.clear()
+            ws.update(values)
+            self.drop_row_index(tab_name)
+
+    def delete_where(self, tab_name, col, values):
+        # Satır silme numaraları kaydırır: aynı anda satır numarası çözmüş bir commit yanlış satıra yazmasın
+        with self.commit_lock: return self._delete_where(tab_name, col, values)
+
+    def _delete_where(self, tab_name, col, values):
+        sh = self.spreadsheet()
+        if not sh: raise ConnectionError("Google Sheets bağlantısı yok")
+        ws = self.worksheet(tab_name)
+        head = sh.values_get(f"'{tab_name}'!1:1").get("values", [])
+        header = [str(h) for h in head[0]] if head else []
+        if col not in header: return 0
+        letter = col_letter(header.index(col) + 1)
+        vals = sh.values_get(f"'{tab_name}'!{letter}2:{letter}", params=READ_PARAMS).get("values", [])
+        values = {str(v) for v in values}
+        rows = [i + 2 for i, v in enumerate(vals) if v and str(v[0]) in values]
+        # Ardışık satırlar tek aralıkta silinir (eski kayıtlar genelde üstte blok halinde); alttan yukarı
+        spans = []
+        for r in rows:
+            if spans and spans[-1][1] == r - 1: spans[-1][1] = r
+            else: spans.append([r, r])
+        if spans:
+            sh.batch_update({"requests": [{"deleteDimension": {"range": {"sheetId": ws.id, "dimension": "ROWS", "startIndex": a - 1, "endIndex": b}}}
+                                          for a, b in reversed(spans)]})
+        self.drop_row_index(tab_name)
+        return len(rows)
+
+# --- SQLITE MOTORU ---
+class SQLiteBackend(StorageBackend):
+    """Aynı sekmeleri yerel, indeksli bir SQLite dosyasında tutar (çevrimdışı test/benchmark için de)"""
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self.tables = set()
+        self.commit_lock = HostLock(path + ".lock")
+        con = sqlite3.connect(self.path, timeout=30)
+        try: con.execute("PRAGMA journal_mode=WAL")  # dosyaya kalıcı yazılır, her bağlantıda gerekmez
+        finally: con.close()
+        with self.connect() as con:
+            for t in SCHEMA: self.ensure_table(con, t)
+
+    def ensure_table(self, con, t):
+        """Tabloyu şemaya göre oluştur/eksik sütunları ekle (arşiv bölümleri ilk kullanımda)"""
+        if t in self.tables: return
+        cols = SCHEMA[base_tab(t)]
+        defs = ", ".join(f'"{c}" {"REAL" if c in NUMERIC_COLS else "TEXT"}' for c in cols)
+        con.execute(f'CREATE TABLE IF NOT EXISTS "{t}" ({defs})')
+        have = [r[1] for r in con.execute(f'PRAGMA table_info("{t}")')]
+        for c in cols:
+            if c not in have: con.execute(f'ALTER TABLE "{t}" ADD COLUMN "{c}" {"REAL" if c in NUMERIC_COLS else "TEXT"}')
+        for c in cols:
+            if c in INDEXED_COLS: con.execute(f'CREATE INDEX IF NOT EXISTS "ix_{t}_{c}" ON "{t}" ("{c}")')
+        self.tables.add(t)
+
+    @contextmanager
+    def connect(self):
+        """Blok tek transaction (hata olursa geri alınır); bağlantı blok sonunda kapanır"""
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con: yield con
+        finally: con.close()
+
+    def revision(self):
+        # WAL modunda yazmalar -wal dosyasına gider
+        return ":".join(str(os.path.getmtime(f)) if os.path.exists(f) else "-" for f in (self.path, self.path + "-wal"))
+
+    def read_values(self, tab_name, start_row=1):
+        cols = SCHEMA[base_tab(tab_name)]
+        sel = ", ".join(f'"{c}"' for c in cols)
+        # Sheets ile aynı numaralama: 1. satır başlık, veri 2'den başlar
+        offset = max(start_row - 2, 0)
+        with self.connect() as con:
+            self.ensure_table(con, tab_name)
+            rows = con.execute(f'SELECT {sel} FROM "{tab_name}" ORDER BY rowid LIMIT -1 OFFSET ?', (offset,)).fetchall()
+        rows = [["" if v is None else v for v in r] for r in rows]
+        return [list(cols)] + rows if start_row <= 1 else rows
+
+    def commit(self, batch):
+        # Tek transaction: ya hepsi ya hiçbiri; commit'ler birbirini SQLite'ın kendi kilidiyle bekler
+        with self.commit_lock.shared(), self.connect() as con:
+            for (t, ucol, uval, tcol, val, is_delta) in batch.updates:
+                # Tek UPDATE ifadesi: artış ve Versiyon+1 atomik, okuma-değiştirme-yazma yok
+                target = f'(SELECT rowid FROM "{t}" WHERE "{ucol}" = ? ORDER BY rowid LIMIT 1)'
+                bump = f', "{VERSION_COL}" = COALESCE("{VERSION_COL}", 0) + 1' if VERSION_COL in SCHEMA[t] else ""
+                if is_delta: con.execute(f'UPDATE "{t}" SET "{tcol}" = COALESCE("{tcol}", 0) + ?{bump} WHERE rowid = {target}', (val, uval))
+                else: con.execute(f'UPDATE "{t}" SET "{tcol}" = ?{bump} WHERE rowid = {target}', (clean_row([val])[0], uval))
+            for t, rows in batch.appends.items():
+                self.ensure_table(con, t)
+                self._insert(con, t, rows)
+            for (t, ucol, uval) in batch.deletes:
+                con.execute(f'DELETE FROM "{t}" WHERE rowid = (SELECT rowid FROM "{t}" WHERE "{ucol}" = ? ORDER BY rowid LIMIT 1)', (uval,))
+        batch.appends, batch.updates, batch.deletes = {}, [], []
+
+    def _insert(self, con, tab_name, rows):
+        cols = list(SCHEMA[base_tab(tab_name)])
+        for row in rows:
+            row = list(row)[:len(cols)]
+            names = ", ".join(f'"{c}"' for c in cols[:len(row)])
+            con.execute(f'INSERT INTO "{tab_name}" ({names}) VALUES ({", ".join("?" * len(row))})', row)
+
+    def rewrite(self, tab_name, values):
+        header = [str(h) for h in values[0]] if values else []
+        cols = SCHEMA[base_tab(tab_name)]
+        rows = [[r[header.index(c)] if c in header and header.index(c) < len(r) else "" for c in cols] for r in values[1:]]
+        with self.commit_lock, self.connect() as con:
+            self.ensure_table(con, tab_name)
+            con.execute(f'DELETE FROM "{tab_name}"')
+            self._insert(con, tab_name, rows)
+
+    def delete_where(self, tab_name, col, values):
+        values, n = sorted({str(v) for v in values}), 0
+        with self.commit_lock, self.connect() as con:
+            self.ensure_table(con, tab_name)
+            for i in range(0, len(values), 500):  # SQLite parametre sınırı
+                part = values[i:i + 500]
+                n += con.execute(f'DELETE FROM "{tab_name}" WHERE "{col}" IN ({", ".join("?" * len(part))})', part).rowcount
+        return n
+
+@st.cache_resource
+def get_backend():
+    """Ayar: storage_backend = "sheets" (varsayılan) | "sqlite", sqlite_path"""
+    if get_setting("storage_backend", "sheets") == "sqlite":
+        return SQLiteBackend(get_setting("sqlite_path", "uretim_takip.db"))
+    return SheetsBackend()
+
+def copy_backend(src, dst):
+    """Tüm sekmeleri (arşiv bölümleri dahil) bir motordan diğerine kopyala (Sheets -> SQLite geçişi)"""
+    archives = frame_from_values("arsiv_manifest", src.read_values("arsiv_manifest"))["Arsiv_Sekme"].tolist()
+    for t in list(SCHEMA) + archives:
+        values = src.read_values(t)
+        if values: dst.rewrite(t, values)
+
+# --- CACHED LOAD (HIZ VE TİP GARANTİSİ) ---
+def _text(v):
+    if v is None: return ""
+    v = str(v)
+    return "" if v in ("nan", "None") else v
+
+def _column(kind, cells):
+    """Ham hücreleri tek geçişte şemadaki tipe çevir"""
+    if kind == "float32":
+        try: arr = np.asarray(cells, dtype="float32")  # UNFORMATTED_VALUE sayıları: hızlı yol
+        except (TypeError, ValueError):
+            # Boş hücre veya virgüllü ondalık ("12,5") varsa
+            fixed = pd.Series([v.replace(",", ".") if isinstance(v, str) else v for v in cells], dtype=object)
+            arr = pd.to_numeric(fixed, errors="coerce").to_numpy(dtype="float32")
+        arr[np.isnan(arr)] = 0.0
+        return arr
+    texts = [_text(v) for v in cells]
+    if kind == "category": return pd.Series(texts, dtype=str).astype("category")
+    if kind == "date":
+        s = pd.Series(texts, dtype=object)
+        d = pd.to_datetime(s, format="ISO8601", errors="coerce")
+        # Sheets yerel biçimi (Türkçe: gün önce, 05.01.2024 = 5 Ocak) tek tek çözülür
+        bad = d.isna() & (s != "")
+        if bad.any(): d[bad] = pd.to_datetime(s[bad], format="mixed", dayfirst=True, errors="coerce")
+        return d
+    return pd.Series(texts, dtype=str)
+
+def frame_from_values(tab_name, values):
+    types = SCHEMA[base_tab(tab_name)]
+    header = [str(h) for h in values[0]] if values else list(types)
+    pos = {}
+    for i, h in enumerate(header):
+        if h in types: pos.setdefault(h, i)
+    idx = list(pos.values())
+    # Boş satırları at
+    rows = [r for r in values[1:] if any(r[i] not in ("", None) for i in idx if i < len(r))]
+    cols = {}
+    for c, kind in types.items():
+        i = pos.get(c)
+        cols[c] = _column(kind, [r[i] if i < len(r) else "" for r in rows] if i is not None else [""] * len(rows))
+    return pd.DataFrame(cols)
+
+def empty_frame(tab_name):
+    return frame_from_values(tab_name, [])
+
+def concat_frames(tab_name, frames):
+    """Aynı sekmenin parçalarını birleştir; kategoriler birleşir (pd.concat farklı kategorileri object'e çevirir)"""
+    if len(frames) == 1: return frames[0]
+    df = pd.concat(frames, ignore_index=True)
+    for c, kind in SCHEMA[base_tab(tab_name)].items():
+        if kind == "category": df[c] = union_categoricals([f[c] for f in frames])
+    return df
+
+# Sekme bazlı cache: her sekmenin bir versiyonu var, yazma sadece dokunduğu sekmelerin versiyonunu artırır.
+# Sadece sona ekleme yapılan sekmelerde yenileme, son okunan satırdan sonrasını çeker.
+# Anlık görüntü açıkken süresi dolan (veya diskten gelen) sekme bekletilmeden verilir, arka planda kontrol edilir
+# (stale-while-revalidate). Bu süreçteki yazmalar versiyonu artırdığı için her zaman hemen okunur.
+CACHE_TTL = 60  # 60 saniye cache tut, sayfa yenilemelerinde hızlı çalışsın
+APPEND_ONLY = {"uretim_loglari", "sevkiyatlar", "silme_loglari", "olay_loglari", "tuketim_loglari"}
+JOURNAL_KEEP = 100  # sekme başına günlükte tutulan son commit
+
+class TabCache:
+    def __init__(self):
+        self.versions = {}  # sekme -> versiyon
+        # sekme -> {"version", "time", "checked", "df", "header", "nrows", "last", "revision", "digest"}
+        # time: verinin okunduğu an (data_version), checked: depoyla son karşılaştırma (TTL)
+        self.entries = {}
+        self.refreshing = set()  # arka planda kontrol edilen sekmeler
+        self.journal = {}  # sekme -> {versiyon: batch}: bu süreçte tamamlanan yazmalar (artımlı özetler için)
+        self.lock = threading.Lock()
+
+@st.cache_resource
+def get_tab_cache():
+    return TabCache()
+
+@st.cache_resource
+def get_snapshots():
+    """Ayar: snapshot=0 kapatır, snapshot_dir. pyarrow yoksa kapalı"""
+    if str(get_setting("snapshot", "1")) == "0": return None
+    return SnapshotStore.open(get_setting("snapshot_dir", "uretim_snapshot"))
+
+def invalidate(*tab_names, batch=None):
+    """Sekmelerin versiyonunu artır. batch: tamamlanan yazma, yeni versiyonla günlüğe yazılır"""
+    cache = get_tab_cache()
+    with cache.lock:
+        for t in tab_names:
+            v = cache.versions[t] = cache.versions.get(t, 0) + 1
+            if batch is None: continue
+            log = cache.journal.setdefault(t, {})
+            log[v] = batch
+            if len(log) > JOURNAL_KEEP: del log[min(log)]
+
+def committed(tab_name, since, version):
+    """Sekmenin since -> version arasındaki versiyon artışlarını yapan batch'ler (sırayla). Aradaki bir artışın
+    batch'i yoksa (yarım kalan yazma, elle temizleme, başka akış) None: o zaman türetilmiş yapı baştan kurulur"""
+    cache = get_tab_cache()
+    with cache.lock:
+        log = cache.journal.get(tab_name, {})
+        vs = range(since + 1, version + 1)
+        return [log[v] for v in vs] if all(v in log for v in vs) else None
+
+def _start_row(tab_name, entry):
+    # Son bilinen satırdan itibaren oku; o satır değişmemişse sadece yeniler eklenir
+    return entry["nrows"] if entry and tab_name in APPEND_ONLY and entry["nrows"] > 1 else 1
+
+def _apply(tab_name, entry, start, values):
+    if start > 1:
+        if not values or values[0] != entry["last"]: return None  # tutmadı -> tam okuma
+        new = values[1:]
+        df = entry["df"]
+        if new: df = concat_frames(tab_name, [df, frame_from_values(tab_name, [entry["header"]] + new)])
+        return df, entry["header"], entry["nrows"] + len(new), (new[-1] if new else entry["last"])
+    header = values[0] if values else []
+    return frame_from_values(tab_name, values), header, len(values), (values[-1] if values else [])
+
+def _from_snapshot(snaps, tab_name):
+    got = snaps.load(tab_name, SCHEMA[base_tab(tab_name)])
+    if not got: return None
+    df, meta = got
+    return {"version": 0, "time": meta["time"], "checked": 0.0, "df": df, "header": meta["header"],
+            "nrows": meta["nrows"], "last": meta["last"], "revision": meta["revision"], "digest": meta["digest"]}
+
+def _save_snapshot(snaps, tab_name, entry):
+    if get_tab_cache().entries.get(tab_name) is not entry: return  # daha yenisi okundu
+    try:
+        meta = {k: entry[k] for k in ("time", "header", "nrows", "last", "revision", "digest")}
+        entry["digest"] = snaps.save(tab_name, entry["df"], meta, SCHEMA[base_tab(tab_name)])
+    except Exception as e:
+        METRICS.count("storage_errors_total", op="snapshot", error=type(e).__name__)
+
+def _fetch(todo, revision=None):
+    """[(anahtar, sekme, versiyon, eski kayıt)] -> {anahtar: df}. Sonuç cache'e ve anlık görüntüye yazılır.
+    İçeriği değişmeyen sekmenin df'i ve okunma zamanı korunur (türetilmiş yapılar boşuna kurulmasın)"""
+    cache, backend, snaps, out = get_tab_cache(), get_backend(), get_snapshots(), {}
+    for attempt in range(2):
+        if not todo: break
+        try:
+            with METRICS.timer("storage_seconds", op="read_many", backend=backend.name):
+                results = backend.read_many([(t, _start_row(t, e) if not attempt else 1) for _, t, _, e in todo])
+        except Exception as e:
+            METRICS.count("storage_errors_total", op="read_many", error=type(e).__name__); break
+        retry = []
+        for (key, t, version, entry), values in zip(todo, results):
+            got = _apply(t, entry, _start_row(t, entry) if not attempt else 1, values)
+            if got is None: retry.append((key, t, version, entry)); continue
+            df, header, nrows, last = got
+            now = time.time()
+            new = {"version": version, "time": now, "checked": now, "df": df, "header": header,
+                   "nrows": nrows, "last": last, "revision": revision, "digest": None}
+            same = entry and entry["version"] == version and (df is entry["df"] or (entry["digest"] and entry["digest"] == frame_digest(df)))
+            if same: new.update(df=entry["df"], time=entry["time"], digest=entry["digest"])
+            with cache.lock:
+                cur = cache.entries.get(t)
+                if not cur or cur["version"] <= version: cache.entries[t] = new
+            if snaps is not None and (not same or revision != entry["revision"]):
+                threading.Thread(target=_save_snapshot, args=(snaps, t, new), daemon=True).start()
+            out[key] = new["df"]
+        todo = retry
+    return out
+
+def _revalidate(keys):
+    """Arka planda: depo damgası değişmemişse sekmeler okunmadan taze sayılır, değiştiyse tek istekte okunur"""
+    cache = get_tab_cache()
+    try:
+        revision = get_backend().revision()
+        todo = []
+        for key in keys:
+            t = TABS[key]; entry = cache.entries.get(t)
+            if not entry: continue
+            if revision is not None and entry["revision"] == revision:
+                with cache.lock: entry["checked"] = time.time()
+                METRICS.count("cache_revalidations_total", tab=t, result="unchanged")
+            else:
+                todo.append((key, t, entry["version"], entry))
+                METRICS.count("cache_revalidations_total", tab=t, result="read")
+        _fetch(todo, revision)
+    finally:
+        with cache.lock: cache.refreshing.difference_update(TABS[k] for k in keys)
+
+def _revalidate_async(keys):
+    cache = get_tab_cache()
+    with cache.lock:
+        keys = [k for k in keys if TABS[k] not in cache.refreshing]
+        cache.refreshing.update(TABS[k] for k in keys)
+    if keys: threading.Thread(target=_revalidate, args=(keys,), name="cache-kontrol", daemon=True).start()
+
+def load_many(*keys):
+    """Verilen sekmeleri getir; cache'te taze olmayanlar tek istekte okunur"""
+    cache, snaps = get_tab_cache(), get_snapshots()
+    out, todo, stale = {}, [], []
+    for key in dict.fromkeys(keys):
+        t = TABS[key]
+        version = cache.versions.get(t, 0)
+        entry = cache.entries.get(t)
+        # Yeni süreç: bu süreçte hiç yazılmamış sekme diskteki görüntüden gelir
+        disk = entry is None and version == 0 and snaps is not None and _from_snapshot(snaps, t)
+        if disk:
+            with cache.lock: entry = cache.entries.setdefault(t, disk)
+        if entry and entry["version"] == version and time.time() - entry["checked"] < CACHE_TTL:
+            out[key] = entry["df"]; METRICS.count("cache_requests_total", tab=t, result="hit")
+        elif entry and entry["version"] == version and snaps is not None:
+            out[key] = entry["df"]; stale.append(key)
+            METRICS.count("cache_requests_total", tab=t, result="snapshot" if entry is disk else "stale")
+        else:
+            todo.append((key, t, version, entry))
+            METRICS.count("cache_requests_total", tab=t, result="incremental" if _start_row(t, entry) > 1 else "miss")
+    out.update(_fetch(todo))
+    if stale: _revalidate_async(stale)
+    # Hata olursa boş dön ama tipleri koru
+    return [out[k].copy() if k in out else empty_frame(TABS[k]) for k in keys]
+
+def load_data(key):
+    return load_many(key)[0]
+
+def data_version(*keys):
+    """Cache'teki sekmelerin damgası; türetilmiş yapılar (graf, indeks) bu değişince yeniden kurulur"""
+    cache = get_tab_cache()
+    out = []
+    for k in keys:
+        e = cache.entries.get(TABS[k])
+        out.append((e["version"], e["time"]) if e else None)
+    return tuple(out)
+
+# --- TÜRETİLMİŞ YAPILAR (İNDEKS, GRAF, ÖZET) ---
+# Sekmelerden kurulan yapılar data_version'a göre süreçte paylaşılır. Ad başına birkaç versiyon tutulur: farklı tarih
+# aralığıyla (since) açık oturumlar birbirininkini silmez. Aynı versiyonu aynı anda isteyenler tek kurulumu bekler.
+MEMO_KEEP = 4
+
+class Memo:
+    def __init__(self):
+        self.slots = {}  # ad -> OrderedDict{versiyon: {"lock", "value", "prev"}}, en son kullanılan sonda
+        self.lock = threading.Lock()
+
+@st.cache_resource
+def get_memo():
+    return Memo()
+
+def memo(name, version, build, prev=False):
+    """name/version için build() sonucu, bir kez kurulur. prev=True ise build(önceki): bu adla en son kurulan değer
+    (yoksa None) verilir, artımlı güncelleme için"""
+    m = get_memo()
+    with m.lock:
+        slot = m.slots.setdefault(name, OrderedDict())
+        entry = slot.get(version)
+        if entry is None:
+            last = next((e for e in reversed(slot.values()) if "value" in e), None)
+            entry = slot[version] = {"lock": threading.Lock(), "prev": last}
+            while len(slot) > MEMO_KEEP: slot.popitem(last=False)
+        slot.move_to_end(version)
+    with entry["lock"]:
+        if "value" not in entry:
+            p = entry.get("prev")
+            entry["value"] = build(p["value"] if p else None) if prev else build()
+            entry.pop("prev", None)
+    return entry["value"]
+
+def clear_cache(*keys):
+    """Verilen sekmelerin (boşsa hepsinin) cache'ini geçersiz kıl ki yeni veri görünsün"""
+    invalidate(*[TABS[k] for k in (keys or TABS)])
+
+def add_row_to_sheet(row_data, key):
+    wb = WriteBatch(); wb.add_row(row_data, key); wb.flush()
+
+def update_cell_in_sheet(key, unique_col_name, unique_val, target_col_name, new_val):
+    wb = WriteBatch(); wb.update_cell(key, unique_col_name, unique_val, target_col_name, new_val); wb.flush()
+
+# --- OLAY LOGU (SİLME / GÜNCELLEME) ---
+# Silme ve düzenlemeler önce olay_loglari'na eklenir, sonra hedef satıra tek satırlık yazma yapılır.
+# Arada bir hata olursa olay kayıtlı kalır; sıkıştırma (compact_events) olayları ana sekmeye tekrar işler.
+COMPACT_EVERY = 50  # bu kadar bekleyen olay birikince otomatik sıkıştır
+
+def new_id(prefix):
+    return f"{prefix}-{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+
+def delete_record(key, unique_col_name, unique_val, tur, detay, neden, wb=None):
+    """Satırı sil: silme olayı + silme_loglari kaydı + hedef satır silme aynı batch'te"""
+    own = wb is None
+    wb = wb or WriteBatch()
+    ev_id, now = new_id("DEL"), str(datetime.now())
+    wb.add_row([ev_id, now, TABS[key], "SIL", unique_col_name, unique_val, "", neden], "events")
+    wb.add_row([ev_id, now, tur, detay, neden], "deletion_logs")
+    wb.delete_row(key, unique_col_name, unique_val)
+    if own: wb.flush(); maybe_compact()
+
+def upsert_record(key, unique_col_name, row, exists, wb=None):
+    """Satırı ekle/güncelle: güncelleme olayı + sadece o satıra yazma"""
+    own = wb is None
+    wb = wb or WriteBatch()
+    unique_val = row[unique_col_name]
+    wb.add_row([new_id("UPD"), str(datetime.now()), TABS[key], "GUNCELLE", unique_col_name, unique_val, json.dumps(clean_row_dict(row), ensure_ascii=False), ""], "events")
+    if exists: wb.update_row(key, unique_col_name, unique_val, row)
+    else: wb.add_row([row.get(c, "") for c in SCHEMA[TABS[key]]], key)
+    if own: wb.flush(); maybe_compact()
+
+def clean_row_dict(row):
+    return dict(zip(row.keys(), clean_row(row.values())))
+
+def pending_events(ev=None):
+    """Son SIKISTIR işaretinden sonraki olaylar"""
+    ev = load_data("events") if ev is None else ev
+    marks = ev.index[ev["Islem"] == "SIKISTIR"]
+    if len(marks): ev = ev.loc[marks[-1] + 1:]
+    return ev[ev["Islem"].isin(["SIL", "GUNCELLE"])]
+
+def maybe_compact():
+    try:
+        if len(pending_events()) >= COMPACT_EVERY: compact_events()
+    except Exception:
+        pass  # sıkıştırma bir sonraki yazmada tekrar denenir
+
+def _same(a, b):
+    a, b = clean_row([a, b])  # Timestamp -> "YYYY-MM-DD"
+    try: return abs(float(str(a).replace(",", ".")) - float(str(b).replace(",", "."))) < 1e-9
+    except: return str(a) == str(b)
+
+def compact_events():
+    """Bekleyen olayları ana sekmelere işle (tekrar oynatmak güvenli) ve SIKISTIR işareti bırak"""
+    by_tab = {v: k for k, v in TABS.items()}
+    clear_cache("events")
+    ev = pending_events()
+    if ev.empty: return 0
+    keys = [by_tab[t] for t in ev["Tablo"].unique() if t in by_tab]
+    clear_cache(*keys)
+    state = dict(zip(keys, load_many(*keys)))
+    wb = WriteBatch()
+    live = {}  # (key, sütun) -> {anahtar: satır_dict | None}
+    for _, e in ev.iterrows():
+        key = by_tab.get(e["Tablo"])
+        if key is None: continue
+        col, val = e["Anahtar_Sutun"], str(e["Anahtar"])
+        if (key, col) not in live:
+            df = state[key]
+            live[(key, col)] = {}
+            if col in df.columns:
+                for rec in df.to_dict("records"): live[(key, col)].setdefault(str(rec[col]), rec)
+        cur = live[(key, col)]
+        if e["Islem"] == "SIL":
+            if cur.get(val) is not None: wb.delete_row(key, col, val)
+            cur[val] = None
+        else:
+            data = json.loads(e["Veri"] or "{}")
+            if cur.get(val) is None:
+                wb.add_row([data.get(c, "") for c in SCHEMA[TABS[key]]], key)
+                cur[val] = data
+            else:
+                diff = {c: v for c, v in data.items() if c in cur[val] and not _same(cur[val][c], v)}
+                if diff: wb.update_row(key, col, val, diff)
+                cur[val] = {**cur[val], **data}
+    wb.add_row([new_id("CMP"), str(datetime.now()), "", "SIKISTIR", "", "", str(len(ev)), ""], "events")
+    wb.flush()
+    return len(ev)
+
+if __name__ == "__main__":
+    # python storage.py sheets-to-sqlite [hedef.db]
+    # python storage.py compact
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "sheets-to-sqlite":
+        copy_backend(SheetsBackend(), SQLiteBackend(sys.argv[2] if len(sys.argv) > 2 else "uretim_takip.db"))
+    elif len(sys.argv) > 1 and sys.argv[1] == "compact":
+        print(compact_events())
@@ -0,0 +1,104 @@
+import pandas as pd
+from storage import SCHEMA, WriteBatch, load_many, data_version, memo, clear_cache, to_float
+from archive import load_with_archive, archive_version
+
+# --- PARTİ SOYAĞACI (İZLENEBİLİRLİK) ---
+# stok_durumu -> tuketim_loglari -> uretim_loglari -> bitmis_urunler -> sevkiyatlar
+# Tüketim tablosu kayıt anında yazılır; eski üretimler için Detaylar metninden türetilir.
+GRAPH_TABS = ("inventory", "production", "finished_goods", "shipments", "consumption")
+
+def parse_detaylar(text):
+    """'Un: U1 (60kg) | Seker: S1 (41kg)' -> [(Hammadde, Parti_No, kg)]"""
+    out = []
+    for d in str(text or "").split(" | "):
+        parts = d.split(": ", 1)
+        if len(parts) != 2 or not parts[0]: continue
+        lot, sep, qty = parts[1].rpartition(" (")
+        if not sep: lot, qty = parts[1], ""
+        out.append((parts[0], lot, to_float(qty.replace("kg", "").replace(")", ""))))
+    return out
+
+def consumption_rows(uid, inp):
+    """Üretim formundaki {hammadde: [{"qty", "lot"}]} girdisinden tüketim satırları"""
+    return [[uid, k, str(e["lot"]), e["qty"]] for k, v in inp.items() if v for e in v if e["qty"] > 0]
+
+def missing_consumption(prod, cons):
+    """Tüketim tablosunda hiç satırı olmayan üretimlerin Detaylar'dan çıkarılmış satırları"""
+    have = set(cons["Uretim_ID"].astype(str)) if not cons.empty else set()
+    rows = []
+    for uid, det in zip(prod["Uretim_ID"].astype(str), prod["Detaylar"]):
+        if uid in have: continue
+        rows += [[uid, h, lot, q] for h, lot, q in parse_detaylar(det)]
+    return pd.DataFrame(rows, columns=list(SCHEMA["tuketim_loglari"]))
+
+def backfill_consumption():
+    """Eski üretimlerin tüketimlerini tuketim_loglari'na yaz; yazılan satır sayısını döner"""
+    clear_cache("production", "consumption")
+    prod, cons = load_many("production", "consumption")
+    miss = missing_consumption(prod, cons)
+    if miss.empty: return 0
+    wb = WriteBatch()
+    for r in miss.values.tolist(): wb.add_row(r, "consumption")
+    wb.flush()
+    return len(miss)
+
+class LotGraph:
+    """Hammadde partisi <-> üretim iki parçalı grafı; sorgular önceden gruplanmış indekslerden okunur"""
+    def __init__(self, inv, prod, fg, sh, cons):
+        cons = pd.concat([cons, missing_consumption(prod, cons)], ignore_index=True) if not prod.empty else cons
+        for df, cols in ((cons, ["Uretim_ID", "Hammadde", "Parti_No"]), (inv, ["Hammadde", "Parti_No"]),
+                         (prod, ["Uretim_ID", "Uretim_Parti_No"]), (fg, ["Uretim_ID", "Uretim_Parti_No"]), (sh, ["Uretim_ID"])):
+            for c in cols: df[c] = df[c].astype(str)
+        self.cons, self.inv, self.prod, self.fg, self.sh = cons, inv, prod, fg, sh
+        self.by_lot = cons.groupby(["Hammadde", "Parti_No"]).indices
+        self.by_parti = cons.groupby("Parti_No").indices
+        self.by_uid = cons.groupby("Uretim_ID").indices
+        self.inv_by_lot = inv.groupby(["Hammadde", "Parti_No"]).indices
+        self.prod_by_uid = prod.groupby("Uretim_ID").indices
+        self.prod_by_lot = prod.groupby("Uretim_Parti_No").indices
+        self.fg_by_uid = fg.groupby("Uretim_ID").indices
+        self.sh_by_uid = sh.groupby("Uretim_ID").indices
+
+    def _take(self, df, index, keys):
+        pos = [p for k in keys for p in index.get(k, [])]
+        return df.iloc[pos]
+
+    def raw_lots(self):
+        """Tüketimi olan (Hammadde, Parti_No) çiftleri"""
+        return sorted(self.by_lot.keys())
+
+    def consumed(self, uid):
+        """Bir üretimde kullanılan hammadde partileri"""
+        return self._take(self.cons, self.by_uid, [str(uid)])[["Hammadde", "Parti_No", "Miktar_KG"]]
+
+    def forward(self, parti_no, hammadde=None):
+        """İleri iz: hammadde partisi -> üretimler, bitmiş ürün partileri, sevkiyatlar"""
+        if hammadde is None: used = self._take(self.cons, self.by_parti, [str(parti_no)])
+        else: used = self._take(self.cons, self.by_lot, [(str(hammadde), str(parti_no))])
+        uids = list(dict.fromkeys(used["Uretim_ID"]))
+        fg = self._take(self.fg, self.fg_by_uid, uids)
+        runs = used.merge(self._take(self.prod, self.prod_by_uid, uids)[["Uretim_ID", "Tarih", "Urun_Kodu", "Uretim_Parti_No"]],
+                          on="Uretim_ID", how="left")
+        runs = runs.merge(fg[["Uretim_ID", "SKT", "Kalan_Net_KG"]], on="Uretim_ID", how="left")
+        return runs, self._take(self.sh, self.sh_by_uid, uids)
+
+    def backward(self, uretim_parti_no):
+        """Geri iz: bitmiş ürün partisi -> kullanılan hammadde partileri ve kaynak stok kayıtları"""
+        uids = list(dict.fromkeys(self.prod["Uretim_ID"].iloc[self.prod_by_lot.get(str(uretim_parti_no), [])]))
+        used = self._take(self.cons, self.by_uid, uids)
+        src = self._take(self.inv, self.inv_by_lot, list(dict.fromkeys(zip(used["Hammadde"], used["Parti_No"]))))
+        src = src[["Hammadde", "Parti_No", "Stok_ID", "Tarih", "Giris_Miktari", "Kalan_Miktar"]].rename(columns={"Tarih": "Giris_Tarihi"})
+        return used.merge(src, on=["Hammadde", "Parti_No"], how="left")
+
+def get_lot_graph(since=None):
+    """Veri değişmedikçe aynı graf kullanılır. since verilirse o tarihten sonraki arşiv bölümleri de dahil"""
+    frames = load_many(*GRAPH_TABS)
+    if since is not None: frames = [load_with_archive(k, since) for k in GRAPH_TABS]
+    ver = (data_version(*GRAPH_TABS), since, tuple(archive_version(k, since) for k in GRAPH_TABS))
+    return memo("lot_graph", ver, lambda: LotGraph(*frames))
+
+if __name__ == "__main__":
+    # python traceability.py backfill
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "backfill":
+        print(backfill_consumption())
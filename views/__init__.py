@@ -0,0 +1,20 @@
+import importlib
+
+# --- SAYFA KAYDI ---
+# Menü adı -> views altındaki modül. Sadece seçili sayfanın modülü içe aktarılır; modül PAGE_TABS (önceden
+# tek istekte yüklenecek sekmeler) ve render() tanımlar
+PAGES = {
+    "📝 Üretim Girişi": "production",
+    "📦 Hammadde Stok": "raw_stock",
+    "📦 Son Ürün Stok": "finished_stock",
+    "🚚 Sevkiyat": "shipping",
+    "🔍 İzlenebilirlik": "trace",
+    "⚙️ Reçeteler": "recipe_admin",
+    "📦 Hammadde Stok (İzle)": "raw_stock_view",
+    "📦 Son Ürün Stok (İzle)": "finished_stock_view"
+}
+ADMIN_MENU = ["📝 Üretim Girişi", "📦 Hammadde Stok", "📦 Son Ürün Stok", "🚚 Sevkiyat", "🔍 İzlenebilirlik", "⚙️ Reçeteler"]
+GUEST_MENU = ["🔍 İzlenebilirlik", "📦 Hammadde Stok (İzle)", "📦 Son Ürün Stok (İzle)"]
+
+def get_page(menu):
+    return importlib.import_module(f"views.{PAGES[menu]}")
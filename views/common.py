@@ -0,0 +1,28 @@
+import streamlit as st
+import pandas as pd
+from storage import load_many, data_version, memo
+from metrics import METRICS
+
+# --- ORTAK YARDIMCILAR (SAYFALAR) ---
+def reset_forms(): st.session_state['form_key'] += 1
+def format_date_tr(date_obj):
+    if pd.isna(date_obj) or str(date_obj)=="": return "-"
+    try: return pd.to_datetime(date_obj).strftime("%d/%m/%Y")
+    except: return str(date_obj)
+def format_dates_tr(col):
+    """Tarih sütunu (datetime64) tek seferde gg/aa/yyyy; boşsa '-'"""
+    return pd.to_datetime(col, errors="coerce").dt.strftime("%d/%m/%Y").fillna("-")
+def section(name):
+    """Sayfa bölümünün süresi (section_seconds; sayfa etiketi ana dosyada oturuma yazılır)"""
+    return METRICS.timer("section_seconds", page=st.session_state.get("page", ""), section=name)
+def archive_since(key):
+    """Geçmiş görünümleri: tarih seçilirse o tarihten sonraki arşiv kayıtları da okunur"""
+    return st.date_input("Arşivden itibaren", value=None, key=key, help="Boş: sadece güncel kayıtlar")
+
+def ingredient_lists():
+    """(SOLID, LIQUID, PACKAGING, ALL_ING): bileşen sekmesi değişmedikçe aynı listeler (değiştirilmemeli)"""
+    ing, = load_many("ingredients")
+    def build():
+        by = {t: ing.loc[ing["Tip"] == t, "Bilesen_Adi"].tolist() for t in ("Katı", "Sıvı", "Ambalaj")}
+        return by["Katı"], by["Sıvı"], by["Ambalaj"], by["Katı"] + by["Sıvı"] + by["Ambalaj"]
+    return memo("ingredient_lists", data_version("ingredients"), build)
@@ -0,0 +1,21 @@
+import streamlit as st
+from storage import load_data, data_version
+from views.common import section
+from views.table import paged_table
+
+PAGE_TABS = ["finished_goods"]
+
+def render(key="tb_fg"):
+    """Depodaki ürün partileri (misafir sayfası da bunu kullanır; key: tablo anahtarı)"""
+    st.header("📦 Son Ürün Stok")
+    fg=load_data("finished_goods")
+    
+    with section("tablo"):
+        if not fg.empty:
+            v=fg[fg["Kalan_Net_KG"]>0].copy()
+            urun_filter = st.selectbox("Ürün Filtresi", ["Tümü"] + sorted(v["Urun_Kodu"].unique().tolist()))
+            if urun_filter != "Tümü":
+                v = v[v["Urun_Kodu"] == urun_filter]
+            v["Tarih"]=v["Uretim_Tarihi"]; v["Paket"]=v["Kalan_Net_KG"]/v["Paket_Agirligi"]
+            paged_table(v[["Urun_Kodu","Uretim_Parti_No","Tarih","SKT","Kalan_Net_KG","Paket"]], key, (data_version("finished_goods"), urun_filter),
+                        dates=["Tarih", "SKT"], file_name="son_urun_stok.csv")
@@ -0,0 +1,7 @@
+from views import finished_stock
+
+PAGE_TABS = finished_stock.PAGE_TABS
+
+def render():
+    """Misafir: depodaki ürün partileri"""
+    finished_stock.render(key="tb_fgv")
@@ -0,0 +1,164 @@
+import streamlit as st
+import pandas as pd
+from datetime import date, datetime, timedelta
+from storage import WriteBatch, load_data
+from traceability import consumption_rows
+from recipes import get_recipe_book
+from lots import get_lot_index
+from planning import allocate, plan_batch
+from views.common import reset_forms, ingredient_lists, section
+
+PAGE_TABS = ["ingredients", "products", "inventory"]
+
+def _prefill(plan, order, lx, SOLID, LIQUID, f_key):
+    """Planın tek siparişini forma yaz; formun alamadığı (fazla partili) hammaddeleri döndür"""
+    ss = st.session_state
+    ss[f"psl_{f_key}"] = order.Urun_Kodu; ss[f"ppk_{f_key}"] = int(order.Paket); ss[f"pdt_{f_key}"] = order.Tarih
+    if order.Parti: ss[f"plt_{f_key}"] = order.Parti
+    label = lambda h, p: next((k for k, v in lx.labels(h)[1].items() if v == p), "Seç...")
+    over = []
+    for h, parts in plan.lots_for(order.Sira).items():
+        if len(parts) > (2 if h in SOLID else 1): over.append(h)
+        if h in SOLID:
+            for j, (p, kg, _) in enumerate(parts[:2]):
+                ss[f"k{j + 1}_{h}_{f_key}"] = float(kg); ss[f"kp{j + 1}_{h}_{f_key}"] = label(h, p)
+        elif h in LIQUID:
+            ss[f"lf_{h}_{f_key}"] = float(parts[0][1]); ss[f"lp_{h}_{f_key}"] = label(h, parts[0][0])
+        else:
+            ss[f"ap_{h}_{f_key}"] = next(r for r in lx.records(h) if r["Parti_No"] == parts[0][0])
+            ss[f"aa_{h}_{f_key}"] = int(parts[0][2])
+    return over
+
+def _plan_panel(prods, book, lx, SOLID, LIQUID, PACKAGING, f_key):
+    """Sipariş listesi -> en eski partiden dağıtım, eksikler; forma aktarma veya hepsini tek seferde kaydetme"""
+    empty = pd.DataFrame({"Urun_Kodu": pd.Series(dtype=str), "Paket": pd.Series(dtype=int), "Ambalaj": pd.Series(dtype=object),
+                          "Parti": pd.Series(dtype=str), "Tarih": pd.Series(dtype="datetime64[ns]")})
+    ed = st.data_editor(empty, num_rows="dynamic", key=f"pl_ed_{f_key}", column_config={
+        "Urun_Kodu": st.column_config.SelectboxColumn("Ürün", options=list(book.codes), required=True),
+        "Paket": st.column_config.NumberColumn("Paket", min_value=0, step=1, required=True),
+        "Ambalaj": st.column_config.MultiselectColumn("Ambalaj (paket başına 1 adet)", options=PACKAGING),
+        "Parti": st.column_config.TextColumn("Parti"),
+        "Tarih": st.column_config.DateColumn("Tarih", default=date.today())})
+    orders = ed.dropna(subset=["Urun_Kodu", "Paket"])
+    orders = orders[orders["Paket"] > 0].reset_index(drop=True)
+    if orders.empty: st.caption("Ürün ve paket girin; partiler en eski girişten başlayarak dağıtılır."); return
+    orders["Parti"] = orders["Parti"].fillna("").astype(str).str.strip()
+    orders["Tarih"] = [pd.Timestamp(t).date() if pd.notna(t) else date.today() for t in orders["Tarih"]]
+    plan = allocate(book, load_data("inventory"), orders[["Urun_Kodu", "Paket", "Ambalaj"]], PACKAGING)
+    orders["Sira"] = plan.orders["Sira"]
+    summ = plan.summary()
+    if plan.ok: st.success(f"{len(orders)} üretim için stok yeterli.")
+    else: st.error("Stok yetersiz: " + ", ".join(f"{h} {r.Eksik:.2f} {r.Birim}" for h, r in summ[summ["Eksik"] > 0].iterrows()))
+    st.dataframe(summ)
+    view = plan.alloc.drop(columns="Stok_ID").assign(Sira=plan.alloc["Sira"] + 1)
+    st.dataframe(view, hide_index=True)
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    sira = c1.selectbox("Sipariş", orders["Sira"], format_func=lambda i: f"{i + 1}. {orders.at[i, 'Urun_Kodu']} x {orders.at[i, 'Paket']}", key=f"pl_sel_{f_key}")
+    if c2.button("Forma Aktar", key=f"pl_fill_{f_key}"):
+        over = _prefill(plan, orders.iloc[sira], lx, SOLID, LIQUID, f_key)
+        if over: st.session_state["pl_warn"] = f"Formda yer yok, ilk partiler aktarıldı: {', '.join(over)}"
+        st.rerun()
+    if st.session_state.get("pl_warn"): st.warning(st.session_state.pop("pl_warn"))
+    no_lot = (orders["Parti"] == "").any()
+    if c3.button("Tümünü Kaydet", type="primary", disabled=not plan.ok or no_lot, key=f"pl_save_{f_key}",
+                 help="Her sipariş için parti numarası gerekli" if no_lot else None):
+        plan_batch(plan, prods, dict(zip(orders["Sira"], zip(orders["Parti"], orders["Tarih"])))).flush()
+        st.success(f"{len(orders)} üretim kaydedildi"); reset_forms(); st.rerun()
+
+def render():
+    """Üretim kaydı: parti seçimi, fireler, stok düşümü"""
+    f_key = st.session_state['form_key']
+    SOLID, LIQUID, PACKAGING, ALL_ING = ingredient_lists()
+    st.header("📝 Üretim Kaydı")
+    prods = load_data("products")
+    if prods.empty: st.warning("Önce ürün ekleyin."); st.stop()
+    # Kalanı olan partiler hammaddeye göre bir kez gruplanır (stok değişince yenilenir)
+    lx = get_lot_index()
+    book = get_recipe_book(SOLID, LIQUID)
+    with st.expander("🗓️ Toplu Plan (en eski parti önce)"), section("plan"):
+        _plan_panel(prods, book, lx, SOLID, LIQUID, PACKAGING, f_key)
+    
+    with section("form"):
+        c1,c2,c3,c4=st.columns(4)
+        pdts=c1.date_input("Tarih", key=f"pdt_{f_key}")
+        psel=c2.selectbox("Ürün", prods["Urun_Kodu"].unique(), key=f"psl_{f_key}")
+        curr=prods[prods["Urun_Kodu"]==psel].iloc[0]
+        plot=c3.text_input("Parti", key=f"plt_{f_key}")
+        ppck=c4.number_input("Paket", 0, key=f"ppk_{f_key}")
+    
+        nkg=ppck*float(curr["Net_Paket_KG"]); st.info(f"Hedef: {nkg} KG")
+        # Teorik ihtiyaç reçete matrisinden tek seferde
+        th_s, th_l = book.theoretical([psel], [ppck])
+        th_s, th_l = th_s.iloc[0], th_l.iloc[0]; rs, rl = book.recipe(psel)
+        inp={}; tf_amb=0.0; details = []
+    
+        st.subheader("1. Ambalaj")
+        for pt in PACKAGING:
+            c_a,c_b = st.columns(2)
+            opts = [None]+lx.records(pt)
+            sel = c_a.selectbox(f"{pt} Parti", opts, format_func=lambda x: "Seç..." if x is None else f"{x['Parti_No']} ({x['Kalan_Miktar']})", key=f"ap_{pt}_{f_key}")
+            act = c_b.number_input(f"{pt} Adet", 0, key=f"aa_{pt}_{f_key}")
+            if sel and act>0:
+                ukg=sel['Ambalaj_Birim_Gr']/1000; ckg=act*ukg; tf_amb+=(act-ppck)*ukg if ppck>0 else 0
+                inp[pt]=[{"qty":ckg, "lot":sel['Parti_No']}]
+                details.append(f"{pt}: {sel['Parti_No']} ({ckg}kg)")
+            else: inp[pt]=None
+        
+        st.divider(); st.subheader("2. Katı")
+        act_s = {}
+        for ig in SOLID:
+            if rs.get(ig,0)>0:
+                st.write(f"{ig} (Teorik: {th_s[ig]:.2f})")
+                ca,cb,cc,cd=st.columns([1.5,2,1.5,2])
+                a1=ca.number_input("M1", key=f"k1_{ig}_{f_key}")
+                lots=lx.labels(ig)[0]
+                l1=lx.lot_of(ig, cb.selectbox("P1", ["Seç..."]+lots, key=f"kp1_{ig}_{f_key}"))
+                a2=cc.number_input("M2", key=f"k2_{ig}_{f_key}")
+                l2=lx.lot_of(ig, cd.selectbox("P2", ["Seç..."]+lots, key=f"kp2_{ig}_{f_key}"))
+                act_s[ig]=a1+a2; en=[]
+                if a1>0: en.append({"qty":a1, "lot":l1}); details.append(f"{ig}: {l1} ({a1}kg)")
+                if a2>0: en.append({"qty":a2, "lot":l2}); details.append(f"{ig}: {l2} ({a2}kg)")
+                inp[ig]=en
+            
+        st.divider(); st.subheader("3. Sıvı")
+        act_l = {}
+        for lg in LIQUID:
+            st.write(f"{lg} (Teorik: {th_l[lg]:.2f})")
+            c1,c2=st.columns(2)
+            a1=c1.number_input("Fiili", key=f"lf_{lg}_{f_key}")
+            l1=lx.lot_of(lg, c2.selectbox("Parti", ["Seç..."]+lx.labels(lg)[0], key=f"lp_{lg}_{f_key}"))
+            act_l[lg]=a1
+            if a1>0: inp[lg]=[{"qty":a1, "lot":l1}]; details.append(f"{lg}: {l1} ({a1}kg)")
+            else: inp[lg]=[]
+        
+    with section("kaydet"):
+        if st.button("Kaydet", type="primary", key=f"sv_{f_key}"):
+            if ppck<=0: st.error("Paket sayısı girin"); st.stop()
+            err=False
+            for k,v in inp.items():
+                if v:
+                    for e in v: 
+                        if e['qty']>0 and "Seç..." in e['lot']: st.error(f"{k} parti seçilmedi"); err=True
+            if not err:
+                uid=f"URT-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                skt=pdts+timedelta(days=int(curr["Raf_Omru_Ay"]*30))
+            
+                # Tüm yazmalar tek seferde: stok düşümleri + üretim logu + bitmiş ürün
+                wb = WriteBatch()
+                fs, fl = book.waste([psel], [ppck], [[act_s.get(i,0) for i in SOLID]], [[act_l.get(i,0) for i in LIQUID]])
+                log_row = [uid, str(pdts), str(psel), str(plot), ppck, nkg, fs[0], fl[0], tf_amb, " | ".join(details)]
+                wb.add_row(log_row, "production")
+            
+                for k,v in inp.items():
+                    if v:
+                        for e in v:
+                            wb.add_to_cell("inventory", "Stok_ID", lx.stok_id(k, e['lot']), "Kalan_Miktar", -e['qty'])
+                # Parti soyağacı için yapılandırılmış tüketim kaydı
+                for r in consumption_rows(uid, inp): wb.add_row(r, "consumption")
+
+                fg_row = [uid, str(psel), str(plot), str(pdts), str(skt), nkg, nkg, float(curr["Net_Paket_KG"])]
+                wb.add_row(fg_row, "finished_goods")
+                wb.flush()
+            
+                st.success("Kaydedildi"); reset_forms(); st.rerun()
@@ -0,0 +1,102 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from storage import WriteBatch, load_data, data_version, add_row_to_sheet, delete_record, upsert_record
+from archive import load_with_archive, archive_version
+from rollups import get_stock_rollup
+from bulk_import import KINDS, template_csv, run_import
+from views.common import reset_forms, format_date_tr, archive_since, ingredient_lists, section
+from views.table import paged_table
+
+PAGE_TABS = ["ingredients", "inventory", "limits", "deletion_logs"]
+
+def render():
+    """Hammadde girişi, silme, kritik limitler ve toplu giriş"""
+    f_key = st.session_state['form_key']
+    SOLID, LIQUID, PACKAGING, ALL_ING = ingredient_lists()
+    st.header("📦 Hammadde Stok")
+    inv = load_data("inventory"); lim = load_data("limits")
+    # Uyarılar: hammadde başına eldeki toplam < kritik limit
+    with section("uyari"):
+        stock = get_stock_rollup()
+        if stock["Dusuk"].any():
+            st.warning(f"Düşük Stok Uyarısı: {', '.join(stock.index[stock['Dusuk']])}")
+    t1,t2,t3,t4 = st.tabs(["Giriş", "Sil", "Limit", "Toplu Giriş"])
+    
+    with t1, section("giris"):
+        c1,c2,c3=st.columns(3); c4,c5=st.columns(2)
+        dt=c1.date_input("Tarih", key=f"sd_{f_key}")
+        ing=c2.selectbox("Hammadde", ALL_ING, key=f"si_{f_key}")
+        lot=c3.text_input("Parti", key=f"sl_{f_key}")
+        qty=c4.number_input("KG", key=f"sq_{f_key}")
+        amb=c5.number_input("Birim Gr", key=f"sa_{f_key}") if ing in PACKAGING else 0.0
+        if st.button("Kaydet", key=f"bs_{f_key}"):
+            sid = f"STK-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            row = [sid, str(dt), ing, lot, qty, qty, "KG", amb]
+            add_row_to_sheet(row, "inventory")
+            st.success("OK"); reset_forms(); st.rerun()
+        if not inv.empty:
+            paged_table(inv, "tb_inv", data_version("inventory"), dates=["Tarih"], file_name="hammadde_stok.csv")
+            
+    with t2, section("sil"):
+        if not inv.empty:
+            opts = [(i, f"{format_date_tr(r['Tarih'])} {r['Hammadde']} {r['Parti_No']}") for i,r in inv.sort_values("Tarih", ascending=False).head(20).iterrows()]
+            sel = st.selectbox("Seç", opts, format_func=lambda x:x[1], key="dsl")
+            neden = st.text_input("Silme Nedeni")
+            if st.button("Sil ve Logla"): 
+                sel_row = inv.iloc[sel[0]]
+                log_detay = f"{sel_row['Hammadde']} - {sel_row['Parti_No']} ({sel_row['Kalan_Miktar']}kg)"
+                delete_record("inventory", "Stok_ID", sel_row["Stok_ID"], "Stok", log_detay, neden)
+                st.success("OK"); st.rerun()
+        if st.session_state['is_admin']:
+            since = archive_since("dla_raw_stock")
+            del_logs = load_with_archive("deletion_logs", since)
+            if not del_logs.empty:
+                st.subheader("Silme Logları")
+                ver = (data_version("deletion_logs"), since, archive_version("deletion_logs", since))
+                paged_table(del_logs[["Tarih", "Tur", "Detay", "Neden"]], "tb_dl_raw", ver, sort="Tarih", asc=False, dates=["Tarih"])
+            
+    with t3, section("limit"):
+        st.dataframe(stock.style.format({"Eldeki_KG":"{:.2f}","Kritik_Limit_KG":"{:.2f}"}))
+        with st.form("lf"):
+            upd=[]
+            for i, ig in enumerate(ALL_ING):
+                cur = 0.0
+                if not lim.empty:
+                    cr = lim[lim["Hammadde"]==ig]
+                    if not cr.empty: cur=float(cr.iloc[0]["Kritik_Limit_KG"])
+                v = st.number_input(f"{ig}", float(cur))
+                upd.append({"Hammadde":ig, "Kritik_Limit_KG":v})
+            if st.form_submit_button("Güncelle"): 
+                # Sadece değişen limitler yazılır
+                cur_lim = dict(zip(lim["Hammadde"], lim["Kritik_Limit_KG"])) if not lim.empty else {}
+                wb = WriteBatch()
+                for u in upd:
+                    if cur_lim.get(u["Hammadde"]) != u["Kritik_Limit_KG"]:
+                        upsert_record("limits", "Hammadde", u, u["Hammadde"] in cur_lim, wb)
+                wb.flush()
+                st.success("OK"); st.rerun()
+
+    with t4, section("toplu_giris"):
+        # CSV/XLSX'ten toplu stok girişi veya eski üretim kayıtları (komut satırı: python bulk_import.py)
+        bk = st.radio("Tür", list(KINDS), format_func=lambda k: KINDS[k]["label"], horizontal=True, key="bi_kind")
+        st.download_button("Şablon (CSV)", template_csv(bk), f"sablon_{bk}.csv", "text/csv")
+        up = st.file_uploader("Dosya", type=["csv", "xlsx"], key="bi_file")
+        skip = st.checkbox("Hatalı satırları atla", key="bi_skip")
+        c1, c2 = st.columns(2)
+        dry, go = c1.button("Kontrol Et", key="bi_chk"), c2.button("Aktar", key="bi_run")
+        if up is not None and (dry or go):
+            bar = st.progress(0.0, "Aktarılıyor...")
+            def prog(done, total): bar.progress(min(done / total, 1.0) if total else 0.0, f"{done}/{total or '?'} satır")
+            try:
+                rep = run_import(bk, up.getvalue(), up.name, dry_run=dry, skip_invalid=skip, progress=prog)
+            except Exception as e:
+                st.error(f"Aktarım durdu: {e}. Aynı dosyayı tekrar yükleyip Aktar'a basınca yazılmış satırlar atlanır, kalanlar yazılır.")
+            else:
+                bar.progress(1.0, "Bitti")
+                msg = f"{rep['rows']} satır: {rep['written']} yazıldı, {rep['existing']} önceden yazılmış, {len(rep['errors'])} hatalı"
+                if dry: st.info(f"{rep['rows']} satır kontrol edildi: {len(rep['errors'])} hatalı, {rep['existing']} önceden yazılmış")
+                elif rep["errors"] and not skip: st.error(msg + " - hiçbir satır yazılmadı")
+                else: st.success(msg)
+                if rep["errors"]:
+                    st.dataframe(pd.DataFrame(rep["errors"], columns=["Satır", "Hata"]), hide_index=True)
@@ -0,0 +1,15 @@
+import streamlit as st
+from storage import load_data, data_version
+from views.common import section
+from views.table import paged_table
+
+PAGE_TABS = ["inventory"]
+
+def render():
+    """Misafir: kalanı olan hammadde partileri"""
+    st.header("📦 Hammadde Stok")
+    inv = load_data("inventory")
+    with section("tablo"):
+        if not inv.empty:
+            paged_table(inv[inv["Kalan_Miktar"] > 0][["Tarih", "Hammadde", "Parti_No", "Kalan_Miktar"]], "tb_invv", data_version("inventory"),
+                        dates=["Tarih"], file_name="hammadde_stok.csv")
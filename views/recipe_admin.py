@@ -0,0 +1,102 @@
+import streamlit as st
+import pandas as pd
+from storage import WriteBatch, load_data, data_version, delete_record, upsert_record
+from recipes import get_recipe_book, dump_recipe
+from archive import load_with_archive, archive_version
+from views.common import reset_forms, archive_since, ingredient_lists, section
+from views.table import paged_table
+
+PAGE_TABS = ["ingredients", "products", "deletion_logs", "limits", "inventory"]
+
+def render():
+    """Ürün/reçete tanımları, hammadde listesi, üretilebilirlik"""
+    f_key = st.session_state['form_key']
+    SOLID, LIQUID, PACKAGING, ALL_ING = ingredient_lists()
+    df_ing_global = load_data("ingredients")
+    st.header("⚙️ Reçeteler")
+    t1, t2, t3, t4 = st.tabs(["Ürün/Reçete", "Hammadde Ekle", "Hammadde Sil", "Üretilebilirlik"])
+    book = get_recipe_book(SOLID, LIQUID)
+    
+    with t2, section("hammadde_ekle"):
+        c1,c2 = st.columns(2)
+        nn = c1.text_input("Ad", key=f"in_{f_key}"); nt = c2.selectbox("Tip", ["Katı","Sıvı","Ambalaj"], key=f"it_{f_key}")
+        if st.button("Ekle", key=f"bi_{f_key}"):
+            if nn and nn not in ALL_ING:
+                wb = WriteBatch()
+                upsert_record("ingredients", "Bilesen_Adi", {"Bilesen_Adi":nn, "Tip":nt}, False, wb)
+                upsert_record("limits", "Hammadde", {"Hammadde":nn, "Kritik_Limit_KG":0}, nn in load_data("limits")["Hammadde"].values, wb)
+                wb.flush()
+                st.success("Eklendi")
+                reset_forms()
+                st.rerun()
+        st.dataframe(df_ing_global)
+
+    with t3, section("hammadde_sil"):
+        if not df_ing_global.empty:
+            sel_ing = st.selectbox("Silinecek Hammadde", df_ing_global["Bilesen_Adi"].unique())
+            neden = st.text_input("Silme Nedeni")
+            if st.button("Sil ve Logla"):
+                # Sil + Logla (olay logu, silme logu ve satır silme tek seferde)
+                delete_record("ingredients", "Bilesen_Adi", sel_ing, "Hammadde", sel_ing, neden)
+                st.success("Silindi ve Loglandı"); st.rerun()
+        if st.session_state['is_admin']:
+            since = archive_since("dla_recipe_admin")
+            del_logs = load_with_archive("deletion_logs", since)
+            if not del_logs.empty:
+                st.subheader("Silme Logları")
+                ver = (data_version("deletion_logs"), since, archive_version("deletion_logs", since))
+                paged_table(del_logs[["Tarih", "Tur", "Detay", "Neden"]], "tb_dl_rec", ver, sort="Tarih", asc=False, dates=["Tarih"])
+
+    with t1, section("recete"):
+        prods = load_data("products")
+        op = st.radio("İşlem", ["Yeni", "Düzenle"], horizontal=True, key=f"op_{f_key}")
+        d_vals = {"Urun_Kodu":"", "Urun_Adi":"", "Net_Paket_KG":10.0, "Raf_Omru_Ay":24}
+        s_sol, s_liq = {}, {}
+        uid = "new"
+        
+        if op=="Düzenle" and not prods.empty:
+            sel = st.selectbox("Seç", prods["Urun_Kodu"].unique(), key=f"slp_{f_key}")
+            row = prods[prods["Urun_Kodu"]==sel].iloc[0]
+            d_vals = row.to_dict()
+            s_sol, s_liq = book.recipe(sel)
+            uid = sel
+
+        with st.form(key=f"pf_{f_key}"):
+            c1,c2,c3,c4=st.columns(4)
+            pc=c1.text_input("Kod", d_vals.get("Urun_Kodu"), disabled=op=="Düzenle", key=f"pc_{uid}_{f_key}")
+            pn=c2.text_input("Ad", d_vals.get("Urun_Adi"), key=f"pn_{uid}_{f_key}")
+            pnt=c3.number_input("Net KG", min_value=0.0, value=float(d_vals.get("Net_Paket_KG", 10)), key=f"pnt_{uid}_{f_key}")
+            psk=c4.number_input("Raf (Ay)", min_value=0, value=int(d_vals.get("Raf_Omru_Ay", 24)), key=f"psk_{uid}_{f_key}")
+            
+            st.subheader("Katı %"); ns={}; tot=0.0; cls=st.columns(4)
+            for i,ing in enumerate(SOLID):
+                v = cls[i%4].number_input(f"{ing}", min_value=0.0, max_value=100.0, value=float(s_sol.get(ing,0)*100), step=0.001, format="%.3f", key=f"s_{ing}_{uid}_{f_key}_{i}")
+                ns[ing]=v/100; tot+=v
+            st.caption(f"Toplam: %{tot:.3f}")
+            st.subheader("Sıvı KG/100"); nl={}
+            for l in LIQUID: nl[l] = st.number_input(f"{l}", min_value=0.0, value=float(s_liq.get(l,0)), key=f"l_{l}_{uid}_{f_key}")
+            
+            if st.form_submit_button("Kaydet"):
+                if abs(tot-100)>0.001: st.error("Katı toplam %100 olmalı")
+                else:
+                    nr = {"Urun_Kodu":str(pc), "Urun_Adi":str(pn), "Net_Paket_KG":pnt, "Raf_Omru_Ay":psk, "Recete_Kati_JSON":dump_recipe(ns), "Recete_Sivi_JSON":dump_recipe(nl)}
+                    upsert_record("products", "Urun_Kodu", nr, op=="Düzenle")
+                    st.success("OK"); reset_forms(); st.rerun()
+        
+        if not prods.empty:
+            # Reçete metinleri kitapta saklı; sadece görünen sayfa çizilir
+            kati, sivi = book.describe()
+            lst = prods[["Urun_Kodu","Urun_Adi","Net_Paket_KG"]].assign(**{"Katı Reçete": kati, "Sıvı Reçete": sivi})
+            paged_table(lst, "tb_rec", data_version("products", "ingredients"), file_name="receteler.csv")
+
+    # ÜRETİLEBİLİRLİK: N PAKET MEVCUT STOKLA ÇIKAR MI?
+    with t4, section("uretilebilirlik"):
+        if book.codes:
+            inv = load_data("inventory")
+            plan = pd.DataFrame({"Urun_Kodu": book.codes, "Max_Paket": book.max_packages(inv).values, "Paket": 0})
+            plan = st.data_editor(plan, disabled=["Urun_Kodu", "Max_Paket"], hide_index=True, key=f"cp_{f_key}")
+            req = book.can_produce(dict(zip(plan["Urun_Kodu"], plan["Paket"])), inv)
+            if not req.empty:
+                if (req["Eksik_KG"] > 0).any(): st.error("Stok yetersiz: " + ", ".join(req.index[req["Eksik_KG"] > 0]))
+                else: st.success("Mevcut stokla üretilebilir")
+                st.dataframe(req.style.format("{:.2f}"))
@@ -0,0 +1,50 @@
+import streamlit as st
+from datetime import datetime
+from storage import WriteBatch, load_data, data_version
+from archive import load_with_archive, archive_version
+from views.common import reset_forms, archive_since, section
+from views.table import paged_table
+
+PAGE_TABS = ["finished_goods", "shipments"]
+
+def render():
+    """Sevkiyat girişi ve geçmişi"""
+    f_key = st.session_state['form_key']
+    st.header("🚚 Sevkiyat")
+    t1,t2 = st.tabs(["Sevk Et", "Geçmiş"])
+    fg=load_data("finished_goods"); sh=load_data("shipments")
+    
+    with t1, section("sevk"):
+        if not fg.empty:
+            act=fg[fg["Kalan_Net_KG"]>0].copy()
+            if not act.empty:
+                sp=st.selectbox("Ürün", act["Urun_Kodu"].unique(), key=f"sp_{f_key}")
+                opts=act[act["Urun_Kodu"]==sp]
+                lst=[(i, f"{r['Uretim_Parti_No']} ({r['Kalan_Net_KG']}kg)") for i,r in opts.iterrows()]
+                si=st.selectbox("Parti", lst, format_func=lambda x:x[1], key=f"si_{f_key}")[0]
+                sr=fg.loc[si]
+                
+                # GÜNCELLEME: TARİH EKLENDİ
+                c1,c2,c3,c4=st.columns(4)
+                s_date = c1.date_input("Sevk Tarihi", value=datetime.now(), key=f"sdt_{f_key}")
+                cu=c2.text_input("Müşteri", key=f"scu_{f_key}")
+                ty=c3.selectbox("Tip", ["Satış","Numune","İmha"], key=f"sty_{f_key}")
+                kg=c4.number_input(f"KG (Max {sr['Kalan_Net_KG']})", max_value=float(sr['Kalan_Net_KG']), key=f"skg_{f_key}")
+                
+                nt=st.text_input("Not", key=f"snt_{f_key}")
+                if st.button("Sevk Et", key=f"sbt_{f_key}"):
+                    # Stok düşümü ve sevkiyat kaydı aynı batch'te: biri gidip diğeri kaybolmasın.
+                    # Düşüm artış olarak gider, yazarken güncel bakiyeye uygulanır (cache'teki eski değer ezilmez)
+                    wb = WriteBatch()
+                    wb.add_to_cell("finished_goods", "Uretim_ID", sr["Uretim_ID"], "Kalan_Net_KG", -kg)
+                    ship_row = [f"S-{datetime.now().strftime('%Y%m%d%H%M')}", str(s_date), str(sr["Uretim_ID"]), cu, ty, kg, nt]
+                    wb.add_row(ship_row, "shipments")
+                    wb.flush()
+                    st.success("Kaydedildi"); reset_forms(); st.rerun()
+            else: st.info("Stok yok")
+    with t2, section("gecmis"):
+        since = archive_since("sha")
+        sh = load_with_archive("shipments", since)
+        if not sh.empty: 
+            ver = (data_version("shipments"), since, archive_version("shipments", since))
+            paged_table(sh, "tb_sh", ver, sort="Sevkiyat_ID", asc=False, dates=["Tarih"], file_name="sevkiyatlar.csv")
@@ -0,0 +1,64 @@
+import io
+import numpy as np
+import streamlit as st
+from views.common import format_dates_tr
+
+# --- SAYFALI TABLO ---
+# Büyük sekmeler tarayıcıya bütün olarak gönderilmez. Arama, sıralama ve sayfa penceresi sunucuda, cache'teki df
+# üzerinde hesaplanır; tarayıcıya sadece görünen sayfa gider. version verilirse arama metni ve son sorgunun satır
+# sırası oturumda saklanır (filtreler oturuma özel), sayfa değiştirmek yeniden sıralamaz. CSV (filtreli sonucun
+# tamamı) ancak tıklanınca, ayrı iş parçacığında üretilir.
+PAGE_SIZES = [25, 50, 100, 250]
+CSV_CHUNK = 5000
+
+def csv_file(df, chunk=CSV_CHUNK):
+    """DataFrame -> CSV dosyası; parça parça yazılır, tablo tek seferde metne çevrilmez"""
+    out = io.BytesIO()
+    out.write("\ufeff".encode())  # BOM: Excel Türkçe karakterleri doğru açar
+    for i in range(0, max(len(df), 1), chunk):
+        out.write(df.iloc[i:i + chunk].to_csv(index=False, header=i == 0).encode())
+    out.seek(0)
+    return out
+
+def _haystack(df):
+    """Arama için satır başına küçük harfli tek metin (tarihler ekrandaki gibi gg/aa/yyyy)"""
+    txt = [format_dates_tr(df[c]) if df[c].dtype.kind == "M" else df[c].astype(str).where(df[c].notna(), "") for c in df.columns]
+    return txt[0].str.cat(txt[1:], sep=" ").str.lower() if len(txt) > 1 else txt[0].str.lower()
+
+def query(df, key, version=None, search="", sort=None, asc=True):
+    """Filtre + sıralama -> df satır konumları (np.ndarray)"""
+    # tablo anahtarı -> {"version", "n", "hay", "last": (sorgu, satır konumları)}
+    h = st.session_state.setdefault("_tablolar", {}).setdefault(key, {}) if version is not None else {}
+    if h.get("version") != version or h.get("n") != len(df): h.clear(); h.update(version=version, n=len(df))
+    q = (search, sort, asc)
+    last = h.get("last")
+    if last and last[0] == q: return last[1]
+    pos = np.arange(len(df))
+    if search:
+        if "hay" not in h: h["hay"] = _haystack(df)
+        pos = pos[h["hay"].str.contains(search.lower(), regex=False).to_numpy(bool)]
+    if sort:
+        s = df[sort].iloc[pos].reset_index(drop=True)
+        pos = pos[s.sort_values(ascending=asc, kind="stable", na_position="last").index.to_numpy()]
+    h["last"] = (q, pos)
+    return pos
+
+def paged_table(df, key, version=None, sort=None, asc=True, dates=(), fmt=None, page_size=50, file_name=None):
+    """Sadece görünen sayfayı çiz. version: df değişince değişen değer (data_version); dates: sayfada gg/aa/yyyy
+    gösterilecek sütunlar, fmt: Styler.format sözlüğü. Ham değerlere göre aranır/sıralanır"""
+    cols = list(df.columns)
+    c1, c2, c3, c4, c5 = st.columns([3, 2, 1, 1, 1])
+    search = c1.text_input("Ara", key=f"{key}_q", placeholder="Tüm sütunlarda")
+    sort = c2.selectbox("Sırala", [None] + cols, index=cols.index(sort) + 1 if sort in cols else 0,
+                        format_func=lambda c: "—" if c is None else c, key=f"{key}_s")
+    asc = c3.selectbox("Yön", ["Artan", "Azalan"], index=0 if asc else 1, key=f"{key}_y") == "Artan"
+    size = c4.selectbox("Satır", PAGE_SIZES, index=PAGE_SIZES.index(page_size), key=f"{key}_n")
+    page = c5.number_input("Sayfa", min_value=1, step=1, key=f"{key}_p")
+    pos = query(df, key, version, search.strip(), sort, asc)
+    pages = max(1, -(-len(pos) // size)); page = min(page, pages)
+    view = df.iloc[pos[(page - 1) * size:page * size]].copy()
+    for c in dates: view[c] = format_dates_tr(view[c])
+    st.dataframe(view.style.format(fmt) if fmt else view, hide_index=True)
+    c1, c2 = st.columns([4, 1])
+    c1.caption(f"{len(pos)} / {len(df)} kayıt · sayfa {page}/{pages}")
+    c2.download_button("CSV", lambda: csv_file(df.iloc[pos]), file_name or f"{key}.csv", "text/csv", key=f"{key}_csv")
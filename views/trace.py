@@ -0,0 +1,92 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from traceability import GRAPH_TABS, get_lot_graph, backfill_consumption
+from storage import data_version
+from archive import load_with_archive, archive_version
+from rollups import PERIODS, add_waste_pct, get_waste_rollup
+from views.common import format_date_tr, format_dates_tr, archive_since, section
+from views.table import paged_table
+
+PAGE_TABS = list(GRAPH_TABS)
+
+def render():
+    """Parti izlenebilirliği, fireler, geri çağırma"""
+    st.header("🔍 İzlenebilirlik")
+    # GÜNCELLEME: TAB SIRALAMASI DEĞİŞTİRİLDİ
+    since = archive_since("iza")
+    t1, t2, t3 = st.tabs(["İzlenebilirlik", "Üretim Detay & Fireler", "Geri Çağırma"])
+    with section("graf"): graph = get_lot_graph(since)
+    
+    # İZLENEBİLİRLİK KISMI (ARTIK T1)
+    with t1, section("izlenebilirlik"):
+        prod=load_with_archive("production", since); fg=load_with_archive("finished_goods", since)
+        if not prod.empty:
+            prod["Tarih_Fmt"]=format_dates_tr(prod["Tarih"])
+            prod["Etiket"]=prod["Uretim_Parti_No"]+" ("+prod["Tarih_Fmt"]+")"
+            sel=st.selectbox("Seç", prod["Etiket"].unique())
+            row=prod[prod["Etiket"]==sel].iloc[0]
+            uid=str(row["Uretim_ID"])
+            rel=fg[fg["Uretim_ID"]==uid]
+            
+            c1,c2,c3,c4=st.columns(4)
+            c1.metric("Tarih", format_date_tr(row["Tarih"]))
+            c2.metric("Depoda", f"{(datetime.now()-pd.to_datetime(row['Tarih'])).days} Gün")
+            if not rel.empty:
+                c3.metric("SKT", format_date_tr(rel.iloc[0]["SKT"]))
+                c4.metric("Stok", f"{float(rel.iloc[0]['Kalan_Net_KG']):.2f} KG")
+            else: c3.metric("Durum", "Silindi")
+            
+            used = graph.consumed(uid)
+            if not used.empty:
+                st.write("**Hammadde Detayları:**")
+                st.table(used.rename(columns={"Parti_No": "Parti", "Miktar_KG": "Miktar"}).reset_index(drop=True))
+
+    # ÜRETİM DETAY & FİRELER KISMI (ARTIK T2)
+    with t2, section("fireler"):
+        prod=load_with_archive("production", since)
+        if not prod.empty:
+            fmt = {"Katı %":"{:.2f}%","Sıvı %":"{:.2f}%","Amb %":"{:.2f}%","Fire_Kati_KG":"{:.2f}","Fire_Sivi_KG":"{:.2f}","Fire_Amb_KG":"{:.2f}","Amb (gr/pkt)":"{:.1f} gr"}
+            cols=["Urun_Kodu","Uretilen_Net_KG","Fire_Kati_KG","Katı %","Fire_Sivi_KG","Sıvı %","Fire_Amb_KG","Amb %","Amb (gr/pkt)"]
+            # Dönem özeti: üretim yazıldıkça güncellenen toplamlardan
+            per = st.radio("Özet", list(PERIODS), index=2, horizontal=True, key="fr_per")
+            summ = get_waste_rollup(since).table(per)
+            if not summ.empty:
+                summ["Baslangic"]=format_dates_tr(summ["Baslangic"])
+                st.dataframe(summ[["Baslangic","Adet"]+cols].style.format({**fmt, "Uretilen_Net_KG":"{:.2f}", "Adet":"{:.0f}"}), hide_index=True)
+            prod = add_waste_pct(prod)
+            ver = (data_version("production"), since, archive_version("production", since))
+            paged_table(prod[["Tarih","Urun_Kodu","Uretim_Parti_No"]+cols[1:]], "tb_fire", ver, dates=["Tarih"], fmt=fmt, file_name="fireler.csv")
+
+    # GERİ ÇAĞIRMA: HAMMADDE PARTİSİ -> ÜRÜN/SEVKİYAT VE TERSİ
+    with t3, section("geri_cagirma"):
+        yon = st.radio("Yön", ["İleri (Hammadde Partisi → Ürün)", "Geri (Ürün Partisi → Hammadde)"], horizontal=True, key="rc_yon")
+        if yon.startswith("İleri"):
+            lots = graph.raw_lots()
+            if lots:
+                c1,c2 = st.columns(2)
+                ham = c1.selectbox("Hammadde", sorted({h for h,_ in lots}), key="rc_ham")
+                lot = c2.selectbox("Parti", [p for h,p in lots if h==ham], key="rc_lot")
+                runs, ships = graph.forward(lot, ham)
+                c1,c2,c3 = st.columns(3)
+                c1.metric("Etkilenen Üretim", runs["Uretim_ID"].nunique())
+                c2.metric("Depoda Kalan", f"{runs.drop_duplicates('Uretim_ID')['Kalan_Net_KG'].fillna(0).sum():.2f} KG")
+                c3.metric("Sevk Edilen", f"{ships['Sevk_Edilen_KG'].sum():.2f} KG")
+                runs["Tarih"]=format_dates_tr(runs["Tarih"]); runs["SKT"]=format_dates_tr(runs["SKT"])
+                st.write("**Üretimler:**")
+                st.dataframe(runs[["Tarih","Urun_Kodu","Uretim_Parti_No","Miktar_KG","SKT","Kalan_Net_KG"]])
+                if not ships.empty:
+                    st.write("**Sevkiyatlar:**")
+                    ships = ships.copy(); ships["Tarih"]=format_dates_tr(ships["Tarih"])
+                    st.dataframe(ships[["Tarih","Uretim_ID","Musteri","Tip","Sevk_Edilen_KG"]])
+            else: st.info("Tüketim kaydı yok")
+        else:
+            fg_lots = graph.fg["Uretim_Parti_No"].unique()
+            if len(fg_lots):
+                sel_lot = st.selectbox("Ürün Partisi", fg_lots, key="rc_fg")
+                src = graph.backward(sel_lot)
+                src["Giris_Tarihi"]=format_dates_tr(src["Giris_Tarihi"])
+                st.dataframe(src[["Hammadde","Parti_No","Miktar_KG","Stok_ID","Giris_Tarihi","Kalan_Miktar"]])
+            else: st.info("Ürün yok")
+        if st.session_state['is_admin'] and st.button("Eski Kayıtları Aktar", key="rc_bf"):
+            st.success(f"{backfill_consumption()} tüketim satırı yazıldı")
@@ -0,0 +1,188 @@
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import sqlite3
+import threading
+import random
+import time
+import os
+import uuid
+from contextlib import contextmanager
+from storage import WriteBatch, get_backend, get_setting, invalidate
+from metrics import METRICS
+
+# --- YAZMA KUYRUĞU (KALICI, ARKA PLANDA) ---
+# Sayfa yazmaları önce yerel SQLite kuyruğuna kaydedilir ve hemen döner.
+# Arka plan işçisi sıradaki batch'leri birleştirip kota sınırı içinde gönderir, hata olursa bekleyip tekrar dener.
+# Aynı makinedeki süreçler aynı kuyruk dosyasını paylaşır: kayıtlar göndermeden önce kiralanır ("gonderiliyor"),
+# kira sürerken başka süreç göndermez. Kirayı tutan süreç gönderirken ölürse (ör. yeniden dağıtım) kayıtlar bir
+# sonraki turda beklemeye döner; süreç tanınamazsa kira dolunca.
+MAX_ATTEMPTS = 8                  # sonra "hata" olarak kalır, arayüzden tekrar denenir
+BACKOFF_BASE, BACKOFF_MAX = 2, 300  # saniye
+MERGE_LIMIT = 50                  # bir gönderimde birleştirilecek en fazla kayıt
+LEASE_SECONDS = 600               # gönderim kirası (sahibi ölü görünmezse en fazla bu kadar sürer)
+OWNER = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"  # kirayı tutan süreç: pid + bu çalıştırmanın jetonu
+
+def _owner_alive(owner):
+    """Kirayı tutan süreç yaşıyor mu. Aynı pid'li eski çalıştırma (konteyner yeniden başladı) ölü sayılır"""
+    try: pid = int(str(owner).split(":")[0])
+    except ValueError: return True  # sahipsiz eski kayıt: kira süresine kalır
+    if pid == os.getpid(): return owner == OWNER
+    if os.name == "nt": return True  # Windows'ta os.kill süreci sonlandırır
+    try: os.kill(pid, 0)
+    except ProcessLookupError: return False
+    except OSError: pass  # başka kullanıcının süreci
+    return True
+
+class TokenBucket:
+    """Dakikalık yazma kotası: rate jeton/sn dolar, en fazla capacity birikir"""
+    def __init__(self, per_minute, capacity=10):
+        self.rate = per_minute / 60.0; self.capacity = capacity
+        self.tokens = float(capacity); self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self, n=1):
+        n = min(n, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate); self.stamp = now
+                if self.tokens >= n: self.tokens -= n; return
+                wait = (n - self.tokens) / self.rate
+            time.sleep(wait)
+
+def api_cost(batch):
+    """Batch'in Sheets'te kaç yazma isteği tutacağı (ekleme sekmesi başına 1, güncelleme 1+okuma, silme 1)"""
+    return len(batch.appends) + (2 if batch.updates or batch.deletes else 0) + (1 if batch.deletes else 0)
+
+class WriteQueue:
+    def __init__(self, path, per_minute=60):
+        self.path = path
+        self.bucket = TokenBucket(per_minute)
+        self.wake = threading.Event()
+        con = sqlite3.connect(self.path, timeout=30)
+        try: con.execute("PRAGMA journal_mode=WAL")
+        finally: con.close()
+        with self.connect() as con:
+            con.execute("""CREATE TABLE IF NOT EXISTS kuyruk (id INTEGER PRIMARY KEY AUTOINCREMENT, olusturma REAL,
+                           batch TEXT, durum TEXT, deneme INTEGER DEFAULT 0, sonraki REAL DEFAULT 0, hata TEXT, kira REAL DEFAULT 0,
+                           sahip TEXT)""")
+            have = [r[1] for r in con.execute("PRAGMA table_info(kuyruk)")]
+            if "kira" not in have: con.execute("ALTER TABLE kuyruk ADD COLUMN kira REAL DEFAULT 0")
+            if "sahip" not in have: con.execute("ALTER TABLE kuyruk ADD COLUMN sahip TEXT")
+        self.thread = threading.Thread(target=self.run, name="yazma-kuyrugu", daemon=True)
+        self.thread.start()
+
+    @contextmanager
+    def connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con: yield con
+        finally: con.close()
+
+    def put(self, batch):
+        with self.connect() as con:
+            con.execute("INSERT INTO kuyruk (olusturma, batch, durum) VALUES (?, ?, 'bekliyor')", (time.time(), batch.to_json()))
+        self.wake.set()
+
+    def counts(self):
+        with self.connect() as con:
+            got = dict(con.execute("SELECT durum, COUNT(*) FROM kuyruk GROUP BY durum").fetchall())
+        return got.get("bekliyor", 0) + got.get("gonderiliyor", 0), got.get("hata", 0)
+
+    def failed(self):
+        """Hatalı kayıtlar: [(id, oluşturma, sekmeler, hata)]"""
+        with self.connect() as con:
+            rows = con.execute("SELECT id, olusturma, batch, hata FROM kuyruk WHERE durum='hata' ORDER BY id").fetchall()
+        return [(i, time.strftime("%d/%m/%Y %H:%M", time.localtime(o)), ", ".join(sorted(WriteBatch.from_json(b).tabs())), h) for i, o, b, h in rows]
+
+    def retry_failed(self):
+        with self.connect() as con:
+            con.execute("UPDATE kuyruk SET durum='bekliyor', deneme=0, sonraki=0 WHERE durum='hata'")
+        self.wake.set()
+
+    def drain(self, timeout=30):
+        """Bekleyen yazmalar bitene kadar bekle (komut satırı ve testler için)"""
+        end = time.time() + timeout
+        self.wake.set()
+        while time.time() < end:
+            if self.counts()[0] == 0: return True
+            time.sleep(0.05)
+        return False
+
+    # --- İŞÇİ ---
+    def run(self):
+        while True:
+            self.wake.wait(1.0); self.wake.clear()
+            try:
+                while self.step(): pass
+            except Exception:
+                time.sleep(1)  # kuyruk dosyası kilitli vb.; bir sonraki turda devam
+
+    def _group(self):
+        """Sıradaki kayıtları tek batch'te birleştirip kirala; silme içeren kayıt grubu kapatır.
+        İlk kayıt beklemedeyse sıra bozulmasın diye hiçbiri gönderilmez. Hatada kalan kaydın sekmelerine dokunan
+        sonraki kayıtlar da, hatalı kayıt tekrar denenene kadar bekler."""
+        now = time.time()
+        with self.connect() as con:
+            con.execute("BEGIN IMMEDIATE")  # okuma + kiralama tek seferde: iki süreç aynı kaydı alamaz
+            con.execute("UPDATE kuyruk SET durum='bekliyor' WHERE durum='gonderiliyor' AND kira <= ?", (now,))
+            for (owner,) in con.execute("SELECT DISTINCT sahip FROM kuyruk WHERE durum='gonderiliyor'").fetchall():
+                if not _owner_alive(owner): con.execute("UPDATE kuyruk SET durum='bekliyor' WHERE durum='gonderiliyor' AND sahip=?", (owner,))
+            if con.execute("SELECT 1 FROM kuyruk WHERE durum='gonderiliyor' LIMIT 1").fetchone(): return [], None, 0
+            blocked = set()
+            for (text,) in con.execute("SELECT batch FROM kuyruk WHERE durum='hata'"): blocked |= WriteBatch.from_json(text).tabs()
+            rows = con.execute("SELECT id, batch, deneme, sonraki FROM kuyruk WHERE durum='bekliyor' ORDER BY id").fetchall()
+            ids, batch, attempts = [], WriteBatch(), 0
+            for i, text, n, nxt in rows:
+                b = WriteBatch.from_json(text)
+                if b.tabs() & blocked: blocked |= b.tabs(); continue
+                if not ids:
+                    if nxt > now: break
+                    attempts = n
+                ids.append(i); batch.merge(b)
+                if b.deletes or len(ids) == MERGE_LIMIT: break
+            if not ids: return [], None, 0
+            mark = ",".join("?" * len(ids))
+            got = con.execute(f"UPDATE kuyruk SET durum='gonderiliyor', kira=?, sahip=? WHERE id IN ({mark}) AND durum='bekliyor'",
+                              [now + LEASE_SECONDS, OWNER] + ids).rowcount
+            if got != len(ids): con.rollback(); return [], None, 0
+        return ids, batch, attempts
+
+    def step(self):
+        ids, batch, attempts = self._group()
+        if not ids: return False
+        tabs, done = batch.tabs(), batch.copy()
+        with METRICS.timer("queue_wait_seconds"): self.bucket.take(api_cost(batch))
+        try:
+            with METRICS.timer("storage_seconds", op="commit", backend="sheets"): get_backend().commit(batch)
+            METRICS.count("queue_commits_total"); METRICS.count("queue_entries_total", len(ids))  # oran = birleştirme
+        except Exception as e:
+            METRICS.count("queue_failures_total", error=type(e).__name__)
+            invalidate(*tabs)
+            self._fail(ids, batch, attempts + 1, e)
+            return False
+        invalidate(*tabs, batch=done)
+        with self.connect() as con:
+            con.executemany("DELETE FROM kuyruk WHERE id=?", [(i,) for i in ids])
+        return True
+
+    def _fail(self, ids, batch, attempts, err):
+        # Gönderilen kısımlar batch'ten düştü; kalan kısım ilk kayda yazılır, diğerleri silinir
+        with self.connect() as con:
+            con.executemany("DELETE FROM kuyruk WHERE id=?", [(i,) for i in ids[1:]])
+            if batch.empty(): con.execute("DELETE FROM kuyruk WHERE id=?", (ids[0],)); return
+            delay = min(BACKOFF_MAX, BACKOFF_BASE ** attempts) * (0.5 + random.random() / 2)
+            con.execute("UPDATE kuyruk SET batch=?, deneme=?, sonraki=?, hata=?, durum=? WHERE id=?",
+                        (batch.to_json(), attempts, time.time() + delay, str(err)[:500],
+                         "hata" if attempts >= MAX_ATTEMPTS else "bekliyor", ids[0]))
+        threading.Timer(delay, self.wake.set).start()
+
+@st.cache_resource
+def get_write_queue():
+    """Ayar: write_queue_path, sheets_writes_per_min"""
+    return WriteQueue(get_setting("write_queue_path", "uretim_kuyruk.db"), float(get_setting("sheets_writes_per_min", 60)))
+
+def queue_enabled():
+    """Sadece Streamlit oturumunda ve Sheets motorunda; komut satırı ve SQLite doğrudan yazar"""
+    if str(get_setting("write_queue", "1")) == "0": return False
+    return get_backend().name == "sheets" and get_script_run_ctx() is not None